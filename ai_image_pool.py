@@ -0,0 +1,64 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+import hashlib
+from instrumentation import metrics
+
+class AIImagePool:
+    def __init__(self, content_generator, image_fetcher, cache):
+        """Generated AI images kept in the image cache, keyed by prompt and day"""
+        self.content_generator = content_generator
+        self.image_fetcher = image_fetcher
+        self.cache = cache
+        self._executor = None
+        self._future = None
+
+    def _key(self, prompt, day):
+        """Cache key of the image generated for a prompt on a day"""
+        digest = hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:16]
+        return f"ai-image://{day.isoformat()}/{digest}"
+
+    def key(self, day=None):
+        """Pool key the day's image is (or will be) stored under, without generating it"""
+        day = day or date.today()
+        return self._key(self.content_generator.image_prompt(day), day)
+
+    def get(self, day=None):
+        """Return (key, bytes) of the day's image, generating it only when the pool has none"""
+        day = day or date.today()
+        prompt = self.content_generator.image_prompt(day)
+        key = self._key(prompt, day)
+        # A pooled image never goes stale: the key already pins prompt and day
+        cached = self.cache.get(key)
+        if cached:
+            return key, cached['data']
+
+        with metrics.stage('ai_image'):
+            url = self.content_generator.generate_tech_image(prompt)
+            # DALL-E URLs expire, so only the bytes are worth keeping
+            data = self.image_fetcher.fetch(url, use_cache=False) if url else None
+        if data is None:
+            return None, None
+        self.cache.put(key, data)
+        return key, data
+
+    def start(self, day=None):
+        """Begin getting the day's image in the background, e.g. while news is fetched"""
+        if self._future is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ai-image')
+            self._future = self._executor.submit(self.get, day)
+            # The single task keeps running; the thread exits once it is done
+            self._executor.shutdown(wait=False)
+        return self._future
+
+    def reset(self):
+        """Forget the background request so the next start asks for a fresh day's image"""
+        self._executor = None
+        self._future = None
+
+    def result(self, day=None):
+        """(key, bytes) of the day's image, waiting for a background request if one is running"""
+        try:
+            return self.start(day).result()
+        except Exception as e:
+            print(f"Error generating AI image: {str(e)}")
+            return None, None
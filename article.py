@@ -0,0 +1,79 @@
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import calendar
+import sys
+import time
+
+def parse_timestamp(value, default=None):
+    """Seconds since the epoch (UTC) of an ISO 8601/RFC 822 string, datetime, struct_time or number"""
+    if value is None or value == '':
+        return int(default if default is not None else time.time())
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, time.struct_time):
+        # feedparser's *_parsed fields are already in UTC
+        return calendar.timegm(value)
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            try:
+                value = parsedate_to_datetime(value)
+            except (TypeError, ValueError):
+                return parse_timestamp(None, default)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+@dataclass(slots=True)
+class Article:
+    """One news item, as every source hands it to the rest of the pipeline"""
+    title: str
+    description: str
+    url: str
+    source: str
+    # Publication time in seconds since the epoch, parsed once when the article is ingested
+    published: int
+    type: str = 'news'
+    image_url: str = None
+
+    def __post_init__(self):
+        # A few source names and types repeat across thousands of articles
+        if self.source:
+            self.source = sys.intern(self.source)
+        self.type = sys.intern(self.type)
+
+    def sort_key(self):
+        """Key ordering articles by publication time, newest last"""
+        return self.published
+
+    @property
+    def published_at(self):
+        """Publication time as an ISO 8601 string"""
+        return datetime.fromtimestamp(self.published, timezone.utc).isoformat()
+
+    def to_dict(self):
+        """Plain dict for JSON storage"""
+        return {
+            'title': self.title,
+            'description': self.description,
+            'url': self.url,
+            'source': self.source,
+            'published': self.published,
+            'type': self.type,
+            'image_url': self.image_url
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Article stored by to_dict, or by earlier versions as a plain article dict"""
+        return cls(
+            title=data.get('title'),
+            description=data.get('description'),
+            url=data.get('url'),
+            source=data.get('source'),
+            published=parse_timestamp(data.get('published', data.get('published_at'))),
+            type=data.get('type') or 'news',
+            image_url=data.get('image_url', data.get('urlToImage'))
+        )
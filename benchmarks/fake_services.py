@@ -0,0 +1,279 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from io import BytesIO
+from PIL import Image
+import hashlib
+import json
+import random
+import socketserver
+import threading
+import time
+
+class ServiceConfig:
+    def __init__(self, latency=0.05, jitter=0.02, failure_rate=0.0, article_count=15,
+                 feed_count=1, feed_entries=30, image_size=(1600, 1000), seed=1):
+        """Behaviour of the stand-in services"""
+        # Seconds added to every HTTP response, plus up to jitter seconds at random
+        self.latency = latency
+        self.jitter = jitter
+        # Fraction of HTTP requests answered with 503
+        self.failure_rate = failure_rate
+        self.article_count = article_count
+        # Number of distinct RSS feeds listed in the feeds file, and entries per feed
+        self.feed_count = feed_count
+        self.feed_entries = feed_entries
+        # Pixel size of the article images served
+        self.image_size = image_size
+        self.random = random.Random(seed)
+
+class FakeServices:
+    def __init__(self, config=None):
+        """Local HTTP and SMTP servers standing in for NewsAPI, RSS, Wikipedia, images and SMTP"""
+        self.config = config or ServiceConfig()
+        self.stats = {'http_requests': 0, 'http_bytes': 0, 'http_failures': 0,
+                      'smtp_messages': 0, 'smtp_recipients': 0, 'smtp_bytes': 0, 'smtp_sessions': 0}
+        self._stats_lock = threading.Lock()
+        self._images = {}
+        self._noise = None
+        # Feed timestamps are fixed so unchanged feeds can answer 304
+        self._started = datetime.now(timezone.utc)
+        self._http = ThreadingHTTPServer(('127.0.0.1', 0), self._http_handler())
+        self._http.daemon_threads = True
+        self._smtp = _ThreadingTCPServer(('127.0.0.1', 0), self._smtp_handler())
+        self._threads = []
+
+    @property
+    def http_url(self):
+        return f"http://127.0.0.1:{self._http.server_address[1]}"
+
+    @property
+    def smtp_port(self):
+        return self._smtp.server_address[1]
+
+    def environment(self):
+        """Environment variables that point the pipeline at these services"""
+        return {
+            'NEWSAPI_URL': f"{self.http_url}/v2/everything",
+            'NEWS_API_KEY': 'benchmark',
+            'WIKIPEDIA_API_URL': f"{self.http_url}/w/api.php",
+            'OPENAI_BASE_URL': f"{self.http_url}/v1",
+            'OPENAI_API_KEY': 'benchmark',
+            'SMTP_HOST': '127.0.0.1',
+            'SMTP_PORT': str(self.smtp_port),
+            'SMTP_STARTTLS': 'false',
+            'GMAIL_SENDER': 'newsletter@example.com',
+            'GMAIL_PASSWORD': 'benchmark'
+        }
+
+    def start(self):
+        for server in (self._http, self._smtp):
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        for server in (self._http, self._smtp):
+            server.shutdown()
+            server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _count(self, **increments):
+        with self._stats_lock:
+            for key, value in increments.items():
+                self.stats[key] += value
+
+    def articles(self, count=None):
+        """Synthetic NewsAPI-shaped articles whose images are served locally"""
+        now = datetime.now(timezone.utc)
+        return [{
+            'title': f"Benchmark story {i}: new chips, models and security patches",
+            'description': f"Story {i} covers developments in AI, cloud computing and cybersecurity. " * 3,
+            'url': f"https://news.example.com/story/{i}",
+            'source': {'name': f"Source {i % 7}"},
+            'publishedAt': (now - timedelta(minutes=i)).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'urlToImage': f"{self.http_url}/images/{i}.jpg"
+        } for i in range(count if count is not None else self.config.article_count)]
+
+    def image(self, key):
+        """JPEG bytes for an image path, generated once per key"""
+        if key not in self._images:
+            rng = random.Random(key)
+            img = Image.new('RGB', self.config.image_size,
+                            (rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+            # Noise keeps the JPEG close to the size of a real photo
+            if self._noise is None:
+                self._noise = Image.effect_noise(self.config.image_size, 40).convert('RGB')
+            img = Image.blend(img, self._noise, 0.5)
+            output = BytesIO()
+            img.save(output, format='JPEG', quality=90)
+            self._images[key] = output.getvalue()
+        return self._images[key]
+
+    def write_feeds_file(self, path):
+        """Write a FEEDS_FILE listing feed_count stand-in feeds and return its path"""
+        feeds = [{'name': f"Feed {i}", 'url': f"{self.http_url}/rss?feed={i}", 'type': 'rss'}
+                 for i in range(self.config.feed_count)]
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(feeds, f)
+        return path
+
+    def preload_images(self, articles):
+        """Generate the images of articles up front so serving them costs no CPU during a run"""
+        for article in articles:
+            self.image(urlparse(article['urlToImage']).path)
+        self.image('/images/ai.png')
+
+    def _rss(self, feed):
+        items = ''.join(
+            f"<item><title>Feed {feed} story {i}</title>"
+            f"<link>https://feed.example.com/{feed}/story/{i}</link>"
+            f"<description>&lt;p&gt;Feed {feed} story {i} about gadgets and software.&lt;/p&gt;</description>"
+            f"<pubDate>{format_datetime(self._started - timedelta(minutes=5 * i))}</pubDate></item>"
+            for i in range(self.config.feed_entries)
+        )
+        return (f'<?xml version="1.0"?><rss version="2.0"><channel><title>Benchmark feed</title>'
+                f'{items}</channel></rss>').encode('utf-8')
+
+    def _wikipedia(self, query):
+        if 'titles' in query:
+            pages = []
+            for i, title in enumerate(query['titles'].split('|')):
+                pages.append({
+                    'pageid': i + 1, 'title': title, 'lastrevid': 1000 + i,
+                    'revisions': [{'timestamp': self._started.strftime('%Y-%m-%dT%H:%M:%SZ')}],
+                    'fullurl': f"https://en.wikipedia.org/wiki/{title.replace(' ', '_')}"
+                })
+            return {'query': {'pages': pages}}
+        return {'query': {'pages': [
+            {'pageid': int(pageid), 'extract': f"Summary of page {pageid}. It has two sentences."}
+            for pageid in query.get('pageids', '').split('|') if pageid
+        ]}}
+
+    def _http_handler(self):
+        services = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def _delay_or_fail(self):
+                config = services.config
+                time.sleep(config.latency + config.random.uniform(0, config.jitter))
+                if config.random.random() < config.failure_rate:
+                    services._count(http_failures=1)
+                    self._send(503, b'unavailable', 'text/plain')
+                    return True
+                return False
+
+            def _send(self, status, body, content_type, headers=None):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+                services._count(http_requests=1, http_bytes=len(body))
+
+            def _send_conditional(self, body, content_type):
+                etag = '"' + hashlib.md5(body).hexdigest() + '"'
+                if self.headers.get('If-None-Match') == etag:
+                    self._send(304, b'', content_type, {'ETag': etag})
+                else:
+                    self._send(200, body, content_type, {'ETag': etag})
+
+            def _json(self, payload):
+                self._send(200, json.dumps(payload).encode('utf-8'), 'application/json')
+
+            def do_GET(self):
+                if self._delay_or_fail():
+                    return
+                url = urlparse(self.path)
+                query = {key: values[0] for key, values in parse_qs(url.query).items()}
+
+                if url.path == '/v2/everything':
+                    page_size = int(query.get('pageSize', 20))
+                    page = int(query.get('page', 1))
+                    articles = services.articles()
+                    self._json({'status': 'ok', 'totalResults': len(articles),
+                                'articles': articles[(page - 1) * page_size:page * page_size]})
+                elif url.path == '/rss':
+                    body = services._rss(query.get('feed', '0'))
+                    self._send_conditional(body, 'application/rss+xml')
+                elif url.path == '/w/api.php':
+                    self._json(services._wikipedia(query))
+                elif url.path.startswith('/images/'):
+                    self._send_conditional(services.image(url.path), 'image/jpeg')
+                else:
+                    self._send(404, b'not found', 'text/plain')
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                self.rfile.read(length)
+                if self._delay_or_fail():
+                    return
+                if urlparse(self.path).path == '/v1/images/generations':
+                    self._json({'created': int(time.time()),
+                                'data': [{'url': f"{services.http_url}/images/ai.png"}]})
+                else:
+                    self._send(404, b'not found', 'text/plain')
+
+        return Handler
+
+    def _smtp_handler(self):
+        services = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def _reply(self, line):
+                self.wfile.write(line.encode('ascii') + b'\r\n')
+
+            def handle(self):
+                services._count(smtp_sessions=1)
+                self._reply('220 benchmark ESMTP')
+                recipients = 0
+                while True:
+                    line = self.rfile.readline()
+                    if not line:
+                        return
+                    command = line.decode('utf-8', 'replace').strip().upper()
+                    if command.startswith(('EHLO', 'HELO')):
+                        self._reply('250-benchmark')
+                        self._reply('250 AUTH PLAIN LOGIN')
+                    elif command.startswith('AUTH'):
+                        self._reply('235 Authentication successful')
+                    elif command.startswith('MAIL'):
+                        recipients = 0
+                        self._reply('250 OK')
+                    elif command.startswith('RCPT'):
+                        recipients += 1
+                        self._reply('250 OK')
+                    elif command == 'DATA':
+                        self._reply('354 End data with <CR><LF>.<CR><LF>')
+                        size = 0
+                        for data_line in self.rfile:
+                            if data_line == b'.\r\n':
+                                break
+                            size += len(data_line)
+                        services._count(smtp_messages=1, smtp_recipients=recipients, smtp_bytes=size)
+                        self._reply('250 Queued')
+                    elif command == 'QUIT':
+                        self._reply('221 Bye')
+                        return
+                    else:
+                        self._reply('250 OK')
+
+        return Handler
+
+class _ThreadingTCPServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
@@ -0,0 +1,185 @@
+"""End-to-end newsletter benchmarks against local stand-in services.
+
+Run from the repository root:
+
+    python -m benchmarks.run
+    python -m benchmarks.run --articles 15 100 --latency 0.2 --output results.json
+"""
+from benchmarks.fake_services import FakeServices, ServiceConfig
+from instrumentation import rss_bytes
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import time
+import tracemalloc
+
+DEFAULT_SCENARIOS = [15, 100, 300, 1000]
+# Seconds between RSS samples taken while a stage runs
+RSS_SAMPLE_INTERVAL = 0.01
+
+def _measure(stage, func, trace_memory=False):
+    """Run one stage, returning its result and timing/memory figures"""
+    if trace_memory:
+        tracemalloc.start()
+    # The process's all-time peak would repeat earlier stages' highs, so RSS is sampled
+    # while this stage runs
+    start_rss = rss_bytes()
+    peak_rss = [start_rss]
+    done = threading.Event()
+
+    def sample():
+        while not done.wait(RSS_SAMPLE_INTERVAL):
+            peak_rss[0] = max(peak_rss[0], rss_bytes())
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    try:
+        result = func()
+    finally:
+        done.set()
+        sampler.join()
+    metrics = {
+        'stage': stage,
+        'wall_s': round(time.perf_counter() - wall_start, 3),
+        'cpu_s': round(time.process_time() - cpu_start, 3),
+        'start_rss_mb': round(start_rss / 2 ** 20, 1),
+        'peak_rss_mb': round(max(peak_rss[0], rss_bytes()) / 2 ** 20, 1)
+    }
+    if trace_memory:
+        metrics['peak_traced_mb'] = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 1)
+        tracemalloc.stop()
+    return result, metrics
+
+def run_scenario(article_count, args):
+    """Fetch and render (cold, warm and cached) and send one deck of article_count slides"""
+    config = ServiceConfig(latency=args.latency, jitter=args.jitter, failure_rate=args.failure_rate,
+                           article_count=article_count, feed_count=args.feeds)
+    cache_dir = tempfile.mkdtemp(prefix='newsletter-bench-')
+    results = []
+    try:
+        with FakeServices(config) as services:
+            os.environ.update(services.environment())
+            os.environ['NEWSLETTER_CACHE_DIR'] = cache_dir
+            os.environ['FEEDS_FILE'] = services.write_feeds_file(os.path.join(cache_dir, 'feeds.json'))
+            os.environ['RECIPIENT_EMAILS'] = ','.join(
+                f"reader{i}@example.com" for i in range(args.recipients))
+
+            # Imported late so every module reads the stand-in configuration
+            from multi_source_fetcher import MultiSourceFetcher
+            from ppt_generator import PPTGenerator
+            from email_sender import EmailSender
+            from newsapi_source import article_from_newsapi
+
+            # The warm fetch finds every feed unchanged and the Wikipedia cache fresh
+            for stage in ('fetch_cold', 'fetch_warm'):
+                fetched, metrics = _measure(stage, lambda: MultiSourceFetcher().fetch_all_news(),
+                                            args.trace_memory)
+                metrics['items'] = len(fetched)
+                results.append(metrics)
+
+            # The fetchers cap each source, so rendering uses the scenario's own article list
+            raw_articles = services.articles(article_count)
+            services.preload_images(raw_articles)
+            articles = [article_from_newsapi(item) for item in raw_articles]
+            pptx_file = os.path.join(cache_dir, 'benchmark.pptx')
+            # The cold render must not leave a deck behind for the warm one to reuse;
+            # the warm render stores its deck and the cached render returns it
+            for stage, cached_decks in (('render_cold', '0'), ('render_warm', '20'), ('render_cached', '20')):
+                os.environ['RENDER_CACHE_MAX_ENTRIES'] = cached_decks
+
+                def render():
+                    ppt_gen = PPTGenerator()
+                    ppt_gen.MAX_NEWS_SLIDES = article_count
+                    return ppt_gen.generate_presentation(articles, pptx_file)
+                _, metrics = _measure(stage, render, args.trace_memory)
+                metrics['items'] = article_count
+                metrics['output_mb'] = round(os.path.getsize(pptx_file) / 2 ** 20, 2)
+                results.append(metrics)
+
+            # The digest path: windows of images streamed through the render workers
+            def render_stream():
+                ppt_gen = PPTGenerator()
+                try:
+                    with ppt_gen.stream_deck(iter(articles)) as deck:
+                        return deck.save(pptx_file)
+                finally:
+                    ppt_gen.close()
+            _, metrics = _measure('render_stream', render_stream, args.trace_memory)
+            metrics['items'] = article_count
+            metrics['output_mb'] = round(os.path.getsize(pptx_file) / 2 ** 20, 2)
+            results.append(metrics)
+
+            sent_before = services.stats['smtp_recipients']
+            _, metrics = _measure('send', lambda: EmailSender().send_newsletter(pptx_file),
+                                  args.trace_memory)
+            metrics['items'] = services.stats['smtp_recipients'] - sent_before
+            results.append(metrics)
+
+            for metrics in results:
+                metrics['articles'] = article_count
+                metrics['per_s'] = round(metrics['items'] / metrics['wall_s'], 1) if metrics['wall_s'] else None
+            return {'articles': article_count, 'stages': results, 'services': dict(services.stats)}
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+def _scenario_process(article_count, args, connection):
+    connection.send(run_scenario(article_count, args))
+    connection.close()
+
+def run_isolated(article_count, args):
+    """run_scenario in a fresh interpreter, so its memory figures owe nothing to earlier scenarios"""
+    context = multiprocessing.get_context('spawn')
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_scenario_process, args=(article_count, args, sender))
+    process.start()
+    sender.close()
+    try:
+        return receiver.recv()
+    except EOFError:
+        process.join()
+        raise RuntimeError(f"Scenario with {article_count} articles failed (exit code {process.exitcode})")
+    finally:
+        process.join()
+
+def print_table(scenarios):
+    columns = ['articles', 'stage', 'items', 'wall_s', 'cpu_s', 'per_s', 'start_rss_mb',
+               'peak_rss_mb', 'peak_traced_mb', 'output_mb']
+    rows = [[str(metrics.get(column, '')) for column in columns]
+            for scenario in scenarios for metrics in scenario['stages']]
+    widths = [max(len(column), *(len(row[i]) for row in rows)) for i, column in enumerate(columns)]
+    print('  '.join(column.ljust(width) for column, width in zip(columns, widths)))
+    for row in rows:
+        print('  '.join(value.ljust(width) for value, width in zip(row, widths)))
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the newsletter pipeline end to end')
+    parser.add_argument('--articles', type=int, nargs='+', default=DEFAULT_SCENARIOS,
+                        help='article counts to benchmark, one scenario each')
+    parser.add_argument('--recipients', type=int, default=200)
+    parser.add_argument('--feeds', type=int, default=50, help='number of stand-in RSS feeds to ingest')
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds added to every HTTP response')
+    parser.add_argument('--jitter', type=float, default=0.02)
+    parser.add_argument('--failure-rate', type=float, default=0.0,
+                        help='fraction of HTTP requests answered with 503')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='report tracemalloc peaks (slows every stage down)')
+    parser.add_argument('--output', help='also write the results to this JSON file')
+    args = parser.parse_args()
+
+    scenarios = []
+    for article_count in args.articles:
+        print(f"Running scenario with {article_count} articles...")
+        scenarios.append(run_isolated(article_count, args))
+
+    print_table(scenarios)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'config': vars(args), 'scenarios': scenarios}, f, indent=2)
+        print(f"Results written to {args.output}")
+
+if __name__ == '__main__':
+    main()
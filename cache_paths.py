@@ -0,0 +1,9 @@
+import os
+
+# Beside the code rather than in the working directory, so a cron job started from
+# anywhere finds the same sent-articles store and caches
+PROJECT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache')
+
+def newsletter_cache_dir():
+    """NEWSLETTER_CACHE_DIR, or .cache in the project directory"""
+    return os.getenv('NEWSLETTER_CACHE_DIR') or PROJECT_CACHE_DIR
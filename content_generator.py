@@ -1,29 +1,42 @@
-import openai
-import pyjokes
 import random
 import os
 from dotenv import load_dotenv
+import source_registry
 
 load_dotenv()
 
 class ContentGenerator:
     def __init__(self):
-        self.openai_client = openai.OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+        self._openai_client = None
+
+    @property
+    def openai_client(self):
+        """OpenAI client, importing the openai package only when an image is requested"""
+        if self._openai_client is None:
+            # The client retries on its own; the timeout bounds a hung image request
+            self._openai_client = source_registry.load_provider('openai')(
+                api_key=os.getenv('OPENAI_API_KEY'), timeout=float(os.getenv('OPENAI_TIMEOUT', 90)))
+        return self._openai_client
         
-    def generate_tech_image(self):
+    def image_prompt(self, day=None):
+        """Prompt for the AI image, picked at random but fixed for a given day"""
+        prompts = [
+            "futuristic technology concept art, bright colors, digital art style",
+            "artificial intelligence visualization, modern, minimalist",
+            "innovative tech gadgets of the future, creative digital art",
+            "cybersecurity concept art, digital landscape",
+            "robotics and automation, futuristic scene"
+        ]
+        if day is None:
+            return random.choice(prompts)
+        return random.Random(day.toordinal()).choice(prompts)
+
+    def generate_tech_image(self, prompt=None):
         """Generate an AI image related to technology"""
         try:
-            prompts = [
-                "futuristic technology concept art, bright colors, digital art style",
-                "artificial intelligence visualization, modern, minimalist",
-                "innovative tech gadgets of the future, creative digital art",
-                "cybersecurity concept art, digital landscape",
-                "robotics and automation, futuristic scene"
-            ]
-            
             response = self.openai_client.images.generate(
                 model="dall-e-3",
-                prompt=random.choice(prompts),
+                prompt=prompt or self.image_prompt(),
                 size="1024x1024",
                 quality="standard",
                 n=1,
@@ -34,8 +47,8 @@ class ContentGenerator:
             print(f"Error generating image: {str(e)}")
             return None
 
-    def generate_tech_quiz(self, count=3):
-        """Generate technology-related quiz questions"""
+    def generate_tech_quiz(self, count=3, seed=None):
+        """Generate technology-related quiz questions; the same seed picks the same questions"""
         quiz_questions = [
             {
                 "question": "What does AI stand for?",
@@ -63,10 +76,11 @@ class ContentGenerator:
                 "correct": "JavaScript"
             }
         ]
-        return random.sample(quiz_questions, min(count, len(quiz_questions)))
+        rng = random.Random(seed) if seed is not None else random
+        return rng.sample(quiz_questions, min(count, len(quiz_questions)))
 
-    def get_tech_joke(self):
-        """Get a technology-related joke"""
+    def get_tech_joke(self, seed=None):
+        """Get a technology-related joke; the same seed picks the same joke"""
         tech_jokes = [
             "Why do programmers prefer dark mode? Because light attracts bugs!",
             "Why did the programmer quit his job? Because he didn't get arrays!",
@@ -76,4 +90,5 @@ class ContentGenerator:
             "Why don't programmers like nature? It has too many bugs!",
             "What's a programmer's favorite hangout spot? Foo Bar!"
         ]
-        return random.choice(tech_jokes) 
\ No newline at end of file
+        rng = random.Random(seed) if seed is not None else random
+        return rng.choice(tech_jokes) 
\ No newline at end of file
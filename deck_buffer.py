@@ -0,0 +1,55 @@
+import hashlib
+import os
+import shutil
+import tempfile
+
+class DeckBuffer:
+    def __init__(self, filename, data=None, spool_max_bytes=None):
+        """A rendered deck held in memory, spilling to a private temp file when it grows large"""
+        # Name the deck is attached under; nothing is written to this path
+        self.filename = filename
+        self.spool_max_bytes = spool_max_bytes or int(os.getenv('DECK_SPOOL_MAX_BYTES', 32 * 1024 * 1024))
+        # Rolls over to a uniquely named temp file past the threshold, so runs never collide
+        self.file = tempfile.SpooledTemporaryFile(max_size=self.spool_max_bytes,
+                                                  prefix='tech_news_', suffix='.pptx')
+        if data is not None:
+            self.file.write(data)
+
+    @property
+    def size(self):
+        position = self.file.tell()
+        self.file.seek(0, os.SEEK_END)
+        size = self.file.tell()
+        self.file.seek(position)
+        return size
+
+    def read(self):
+        """The whole deck as bytes"""
+        self.file.seek(0)
+        return self.file.read()
+
+    def digest(self):
+        """SHA-1 hex digest of the deck's bytes"""
+        self.file.seek(0)
+        sha1 = hashlib.sha1()
+        for chunk in iter(lambda: self.file.read(1024 * 1024), b''):
+            sha1.update(chunk)
+        return sha1.hexdigest()
+
+    def save(self, path):
+        """Write a copy of the deck to path atomically, so nobody reads it half written"""
+        self.file.seek(0)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            shutil.copyfileobj(self.file, f)
+        os.replace(tmp_path, path)
+        return path
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,180 @@
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from collections import defaultdict
+from itertools import combinations
+import re
+import numpy as np
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid', 'igshid',
+    'ref', 'ref_src', 'referrer', 'cmpid', 'ocid', 'ito', 'sr_share',
+    'amp', 'outputtype', 'frommail'
+}
+TRACKING_PREFIXES = ('utm_', 'pk_', 'at_', 'ns_', 'mkt_')
+# Host prefixes used for mobile and AMP copies of the same page
+MOBILE_HOST_PREFIXES = ('www.', 'm.', 'mobile.', 'amp.')
+
+_WORD_RE = re.compile(r'[a-z0-9]+')
+
+def canonicalize_url(url):
+    """Normalize a URL so syndicated, AMP and mobile copies compare equal"""
+    if not url:
+        return ''
+    url = url.strip()
+    # Feeds sometimes leave out the scheme; without it the host would be read as the path
+    if '://' not in url and not url.startswith('/'):
+        url = '//' + url
+    try:
+        parts = urlsplit(url)
+        host = (parts.hostname or '').lower()
+    except ValueError:
+        # Malformed, e.g. an unclosed IPv6 bracket; compare it as written
+        return url
+    if not host:
+        return url
+
+    # Google AMP cache: https://www.google.com/amp/s/example.com/story
+    path = parts.path
+    if host.endswith('google.com') and path.startswith('/amp/s/'):
+        return canonicalize_url('https://' + path[len('/amp/s/'):])
+    if host.endswith('.cdn.ampproject.org') and path.startswith(('/c/s/', '/v/s/')):
+        return canonicalize_url('https://' + path[len('/c/s/'):])
+
+    for prefix in MOBILE_HOST_PREFIXES:
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+            break
+
+    # AMP variants usually live under /amp/ or end in /amp or .amp
+    path = re.sub(r'^/amp(?=/)', '', path)
+    path = re.sub(r'(/amp|\.amp)/?$', '', path)
+    path = path.rstrip('/') or '/'
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+    return urlunsplit(('https', host, path, urlencode(query), ''))
+
+class ArticleDeduplicator:
+    def __init__(self, threshold=0.5, num_perm=64, bands=16, max_bucket=32):
+        """Find duplicate articles by canonical URL and by MinHash/LSH over their text"""
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        # Buckets larger than this, usually filled by shared boilerplate such as a "read more /
+        # subscribe" tail, only compare neighbours, so per-article work stays bounded
+        self.max_bucket = max_bucket
+        # Multiply-add-shift hash functions over 32-bit shingle hashes, one per permutation
+        rng = np.random.default_rng(1)
+        self._multipliers = rng.integers(1, 2 ** 63, num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._increments = rng.integers(0, 2 ** 63, num_perm, dtype=np.uint64)
+
+    def _shingles(self, article):
+        """Word 3-gram shingles of an article's title and description"""
+        text = f"{article.title or ''} {(article.description or '')[:300]}"
+        words = _WORD_RE.findall(text.lower())
+        if len(words) < 3:
+            return {' '.join(words)} if words else set()
+        return {' '.join(words[i:i + 3]) for i in range(len(words) - 2)}
+
+    def _signatures(self, shingle_sets):
+        """MinHash signatures of non-empty shingle sets, one row per set"""
+        sizes = np.fromiter(map(len, shingle_sets), dtype=np.intp, count=len(shingle_sets))
+        starts = np.concatenate(([0], np.cumsum(sizes)))
+        # Signatures are only compared within this call, so Python's per-process string hash will do
+        flat = np.fromiter((hash(shingle) & 0xFFFFFFFF for shingles in shingle_sets for shingle in shingles),
+                           dtype=np.uint64, count=int(starts[-1]))
+
+        signatures = np.empty((self.num_perm, len(shingle_sets)), dtype=np.uint32)
+        # A few thousand sets at a time keeps the (num_perm x shingles) matrix small; shingles
+        # run along rows so each set's minimum is taken over contiguous memory
+        for first in range(0, len(shingle_sets), 2048):
+            last = min(first + 2048, len(shingle_sets))
+            offsets = starts[first:last] - starts[first]
+            hashes = (self._multipliers[:, None] * flat[starts[first]:starts[last]]
+                      + self._increments[:, None]) >> np.uint64(32)
+            signatures[:, first:last] = np.minimum.reduceat(hashes.astype(np.uint32), offsets, axis=1)
+        return signatures.T.copy()
+
+    def _candidates(self, signatures, pairs):
+        """Pairs of signature rows whose estimated similarity comes near the threshold"""
+        if not pairs:
+            return []
+        pairs = np.array(list(pairs), dtype=np.intp)
+        # The estimate's standard error is at most 0.5/sqrt(num_perm); allowing three of them keeps
+        # borderline pairs for the exact check
+        cutoff = (self.threshold - 1.5 / np.sqrt(self.num_perm)) * self.num_perm
+        close = []
+        for first in range(0, len(pairs), 65536):
+            chunk = pairs[first:first + 65536]
+            agree = np.count_nonzero(signatures[chunk[:, 0]] == signatures[chunk[:, 1]], axis=1)
+            close.append(chunk[agree >= cutoff])
+        return np.concatenate(close).tolist()
+
+    def _similar(self, first, second):
+        """Whether two shingle sets are close enough to count as the same story"""
+        return len(first & second) / len(first | second) >= self.threshold
+
+    def _prefer(self, current, candidate):
+        """Pick which of two duplicates to keep"""
+        # Keep the earlier article unless only the later one has an image
+        if not current.image_url and candidate.image_url:
+            return candidate
+        return current
+
+    def deduplicate(self, articles):
+        """Return articles with duplicates removed, keeping the original order"""
+        parent = list(range(len(articles)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        def union(i, j):
+            root_i, root_j = find(i), find(j)
+            if root_i != root_j:
+                parent[max(root_i, root_j)] = min(root_i, root_j)
+
+        # Exact matches on canonical URL
+        by_url = {}
+        for i, article in enumerate(articles):
+            url = canonicalize_url(article.url)
+            if url:
+                union(i, by_url.setdefault(url, i))
+
+        # Near-duplicate text: articles sharing an LSH band become candidates
+        shingles = [self._shingles(article) for article in articles]
+        indexed = [i for i, article_shingles in enumerate(shingles) if article_shingles]
+        if indexed:
+            signatures = self._signatures([shingles[i] for i in indexed])
+            buckets = defaultdict(list)
+            for band in range(self.bands):
+                # Each band of a signature as one bytes key
+                keys = np.ascontiguousarray(signatures[:, band * self.rows:(band + 1) * self.rows])
+                for row, key in enumerate(keys.view(f'V{keys.itemsize * self.rows}').ravel().tolist()):
+                    buckets[(band, key)].append(row)
+
+            pairs = set()
+            for members in buckets.values():
+                if len(members) <= self.max_bucket:
+                    pairs.update(combinations(members, 2))
+                else:
+                    # Still joins a large group of copies, one neighbour at a time
+                    pairs.update(zip(members, members[1:]))
+
+            for first, second in self._candidates(signatures, pairs):
+                i, j = indexed[first], indexed[second]
+                if find(i) != find(j) and self._similar(shingles[i], shingles[j]):
+                    union(i, j)
+
+        kept = {}
+        for i, article in enumerate(articles):
+            root = find(i)
+            kept[root] = self._prefer(kept[root], article) if root in kept else article
+        return [kept[root] for root in sorted(kept)]
@@ -0,0 +1,129 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from deck_buffer import DeckBuffer
+from ranker import ArticleRanker
+import json
+import os
+
+class Edition:
+    def __init__(self, name, recipients=None, keywords=None, types=None, sources=None,
+                 order='newest', max_articles=None):
+        """A deck variant with its own article filter, ordering and recipient group"""
+        self.name = name
+        self.recipients = recipients or []
+        # An article matches when its title or description mentions any keyword
+        self.keywords = [keyword.lower() for keyword in (keywords or [])]
+        self.types = set(types or [])
+        self.sources = set(sources or [])
+        self.order = order
+        self.max_articles = max_articles
+
+    @classmethod
+    def from_dict(cls, config):
+        """Build an edition from one entry of the editions file"""
+        return cls(
+            config['name'],
+            recipients=config.get('recipients'),
+            keywords=config.get('keywords'),
+            types=config.get('types'),
+            sources=config.get('sources'),
+            order=config.get('order', 'newest'),
+            max_articles=config.get('max_articles')
+        )
+
+    def matches(self, article):
+        """Whether an article belongs in this edition"""
+        if self.types and article.type not in self.types:
+            return False
+        if self.sources and article.source not in self.sources:
+            return False
+        if self.keywords:
+            text = f"{article.title or ''} {article.description or ''}".lower()
+            return any(keyword in text for keyword in self.keywords)
+        return True
+
+    def select(self, articles):
+        """Filter and order the shared article list for this edition"""
+        selected = [article for article in articles if self.matches(article)]
+        # Articles arrive newest first from MultiSourceFetcher
+        if self.order == 'oldest':
+            selected.reverse()
+        elif self.order == 'source':
+            selected.sort(key=lambda article: article.source or '')
+        elif self.order == 'relevance':
+            # Scored against the edition's own keywords when it has any
+            ranker = ArticleRanker(keywords=self.keywords or None)
+            selected = ranker.select(selected, self.max_articles or len(selected))
+        if self.max_articles:
+            selected = selected[:self.max_articles]
+        return selected
+
+def load_editions(path=None):
+    """Read edition definitions from a JSON file, returning [] when there is none"""
+    path = path or os.getenv('EDITIONS_FILE', 'editions.json')
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return [Edition.from_dict(config) for config in json.load(f)]
+
+def _render_edition(name, articles, images, ai_image_url):
+    """Worker process: render one edition's deck from prefetched images, returning its bytes"""
+    from ppt_generator import PPTGenerator
+
+    ppt_gen = PPTGenerator()
+    ppt_gen.images = images
+    ppt_gen.ai_image_url = ai_image_url
+    # The parent already tried every image; whatever is missing gets the text layout
+    ppt_gen.prefetched = True
+    with ppt_gen.render_deck(articles) as deck:
+        return deck.read()
+
+def render_editions(editions, selections, ppt_gen, max_workers=None):
+    """Render every edition in worker processes, yielding (edition, DeckBuffer) as each finishes"""
+    selections = {name: selection[:ppt_gen.MAX_NEWS_SLIDES] for name, selection in selections.items()}
+    filenames = {edition.name: f"tech_news_{datetime.now().strftime('%Y%m%d')}_{edition.name}.pptx"
+                 for edition in editions}
+
+    # Editions with identical decks share one render, and decks rendered
+    # earlier from the same inputs are not rendered at all
+    groups = {}
+    for edition in editions:
+        if not selections[edition.name]:
+            print(f"No articles for edition '{edition.name}', skipping")
+            continue
+        groups.setdefault(ppt_gen.deck_fingerprint(selections[edition.name]), []).append(edition)
+
+    to_render = {}
+    for fingerprint, sharing in groups.items():
+        data = ppt_gen.render_cache.get(fingerprint)
+        if data is None:
+            to_render[fingerprint] = sharing
+            continue
+        for edition in sharing:
+            yield edition, DeckBuffer(filenames[edition.name], data)
+    if not to_render:
+        return
+
+    # Fetch and normalize every image once, for all editions together
+    ppt_gen.prefetch_images([article for sharing in to_render.values()
+                             for article in selections[sharing[0].name]])
+
+    max_workers = max_workers or int(os.getenv('EDITION_WORKERS', min(len(to_render), os.cpu_count() or 1)))
+    with ProcessPoolExecutor(max_workers=max(max_workers, 1)) as executor:
+        futures = {}
+        for sharing in to_render.values():
+            selection = selections[sharing[0].name]
+            # Ship only the images this edition uses to its worker
+            future = executor.submit(_render_edition, sharing[0].name, selection,
+                                     ppt_gen.images_for(selection), ppt_gen.ai_image_url)
+            futures[future] = sharing
+
+        for future in as_completed(futures):
+            try:
+                data = future.result()
+            except Exception as e:
+                for edition in futures[future]:
+                    print(f"Error rendering edition '{edition.name}': {str(e)}")
+                continue
+            for edition in futures[future]:
+                yield edition, DeckBuffer(filenames[edition.name], data)
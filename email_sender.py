@@ -1,10 +1,22 @@
 import smtplib
+import socket
+import threading
+import queue
+import time
+import random
+from email import policy
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.application import MIMEApplication
+from email.utils import formatdate, make_msgid
 from datetime import datetime
 from dotenv import load_dotenv
 import os
+from instrumentation import metrics
+
+# SMTP errors worth retrying on a fresh connection
+TRANSIENT_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError,
+                    socket.timeout, ConnectionError)
 
 class EmailSender:
     def __init__(self):
@@ -25,15 +37,43 @@ class EmailSender:
         if not self.recipient_emails:
             raise ValueError("No recipient emails configured in .env file")
 
-    def send_newsletter(self, pptx_file):
-        """Send newsletter to all configured recipients"""
-        try:
-            # Create subject with date
-            current_date = datetime.now().strftime("%B %d, %Y")
-            subject = f"Daily Tech Newsletter - {current_date}"
-            
-            # Create email body
-            body = f"""Hello,
+        # SMTP server and delivery settings
+        self.smtp_host = os.getenv('SMTP_HOST', 'smtp.gmail.com')
+        self.smtp_port = int(os.getenv('SMTP_PORT', 587))
+        self.smtp_starttls = os.getenv('SMTP_STARTTLS', 'true').lower() == 'true'
+        self.smtp_timeout = float(os.getenv('SMTP_TIMEOUT', 30))
+        # 'bcc' sends one message per batch of hidden recipients, 'individual' one per recipient
+        self.delivery_mode = os.getenv('DELIVERY_MODE', 'bcc').lower()
+        self.batch_size = int(os.getenv('SMTP_BATCH_SIZE', 50))
+        self.connections = int(os.getenv('SMTP_CONNECTIONS', 4))
+        self.messages_per_connection = int(os.getenv('SMTP_MESSAGES_PER_CONNECTION', 100))
+        self.max_retries = int(os.getenv('SMTP_MAX_RETRIES', 3))
+
+    def _connect(self):
+        """Open an authenticated SMTP session"""
+        server = smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=self.smtp_timeout)
+        if self.smtp_starttls:
+            server.starttls()
+        server.login(self.sender_email, self.sender_password)
+        return server
+
+    def _close(self, server):
+        """Politely end an SMTP session, ignoring errors from a dead connection"""
+        if server is not None:
+            try:
+                server.quit()
+            except Exception:
+                server.close()
+        return None
+
+    def _build_message(self, deck, html=None):
+        """Build the newsletter once and return it serialized, without a To header"""
+        # Create subject with date
+        current_date = datetime.now().strftime("%B %d, %Y")
+        subject = f"Daily Tech Newsletter - {current_date}"
+        
+        # Create email body
+        body = f"""Hello,
 
 Your daily tech newsletter for {current_date} is attached.
 
@@ -48,27 +88,151 @@ The PowerPoint presentation is attached for your review.
 Best regards,
 Your Tech Newsletter Team"""
 
-            # Create message
+        # The HTML edition replaces the plain body, and the deck attachment too when there is no deck
+        if html is not None and deck is None:
+            msg = html.mime_part()
+        else:
             msg = MIMEMultipart()
-            msg['From'] = self.sender_email
-            msg['To'] = ', '.join(self.recipient_emails)
-            msg['Subject'] = subject
-            msg.attach(MIMEText(body, 'plain'))
-            
-            # Attach PowerPoint file
-            with open(pptx_file, 'rb') as f:
-                part = MIMEApplication(f.read(), Name=os.path.basename(pptx_file))
-                part['Content-Disposition'] = f'attachment; filename="{os.path.basename(pptx_file)}"'
-                msg.attach(part)
-            
-            # Send email
-            with smtplib.SMTP('smtp.gmail.com', 587) as server:
-                server.starttls()
-                server.login(self.sender_email, self.sender_password)
-                server.send_message(msg)
+            msg.attach(html.mime_part() if html is not None else MIMEText(body, 'plain'))
+        msg['From'] = self.sender_email
+        msg['Subject'] = subject
+        msg['Date'] = formatdate(localtime=True)
+        msg['Message-ID'] = make_msgid()
+        if deck is None:
+            return msg.as_bytes(policy=policy.SMTP)
+
+        # Attach the deck (a DeckBuffer or a file path), base64-encoded a single time for every message
+        if isinstance(deck, str):
+            filename = os.path.basename(deck)
+            with open(deck, 'rb') as f:
+                data = f.read()
+        else:
+            filename = deck.filename
+            data = deck.read()
+        part = MIMEApplication(data, Name=filename)
+        part['Content-Disposition'] = f'attachment; filename="{filename}"'
+        msg.attach(part)
+        
+        return msg.as_bytes(policy=policy.SMTP)
+
+    def _batches(self, recipients):
+        """Split recipients into envelopes according to the delivery mode"""
+        size = 1 if self.delivery_mode == 'individual' else max(self.batch_size, 1)
+        return [recipients[i:i + size] for i in range(0, len(recipients), size)]
+
+    def _to_header(self, batch):
+        """To header for one envelope; BCC batches never reveal recipients"""
+        if self.delivery_mode == 'individual':
+            return f"To: {batch[0]}\r\n".encode('utf-8')
+        return b"To: undisclosed-recipients:;\r\n"
+
+    def _deliver(self, message, recipients):
+        """Send one message to every recipient over a pool of reused SMTP sessions"""
+        jobs = queue.Queue()
+        for batch in self._batches(recipients):
+            # Each job is (not_before, attempt, recipients)
+            jobs.put((0, 0, batch))
+
+        results = {'sent': [], 'failed': []}
+        results_lock = threading.Lock()
+
+        def retry_or_fail(attempt, batch, error):
+            if attempt < self.max_retries:
+                # Jittered exponential backoff before the next attempt
+                delay = (2 ** attempt) + random.uniform(0, 1)
+                jobs.put((time.monotonic() + delay, attempt + 1, batch))
+            else:
+                print(f"Giving up on {len(batch)} recipients: {str(error)}")
+                with results_lock:
+                    results['failed'].extend(batch)
+
+        def worker():
+            server = None
+            sent_on_connection = 0
+            while True:
+                job = jobs.get()
+                if job is None:
+                    break
+                not_before, attempt, batch = job
+                try:
+                    wait = not_before - time.monotonic()
+                    if wait > 0:
+                        time.sleep(wait)
+
+                    # Recycle sessions before the server starts refusing messages
+                    if server is not None and sent_on_connection >= self.messages_per_connection:
+                        server = self._close(server)
+                    if server is None:
+                        server = self._connect()
+                        sent_on_connection = 0
+
+                    envelope = self._to_header(batch) + message
+                    with metrics.stage('smtp_batch'):
+                        refused = server.sendmail(self.sender_email, batch, envelope)
+                    metrics.add_bytes('smtp_batch', len(envelope))
+                    sent_on_connection += 1
+
+                    temporary = [rcpt for rcpt, (code, _) in refused.items() if 400 <= code < 500]
+                    with results_lock:
+                        results['sent'].extend(rcpt for rcpt in batch if rcpt not in refused)
+                        results['failed'].extend(rcpt for rcpt in refused if rcpt not in temporary)
+                    if temporary:
+                        retry_or_fail(attempt, temporary, "temporarily refused")
+                except smtplib.SMTPRecipientsRefused as e:
+                    temporary = [rcpt for rcpt, (code, _) in e.recipients.items() if 400 <= code < 500]
+                    with results_lock:
+                        results['failed'].extend(rcpt for rcpt in e.recipients if rcpt not in temporary)
+                    if temporary:
+                        retry_or_fail(attempt, temporary, e)
+                except smtplib.SMTPResponseException as e:
+                    if 400 <= e.smtp_code < 500:
+                        # The server may have dropped the session, start a new one
+                        server = self._close(server)
+                        retry_or_fail(attempt, batch, e)
+                    else:
+                        print(f"Permanent SMTP error for {len(batch)} recipients: {str(e)}")
+                        with results_lock:
+                            results['failed'].extend(batch)
+                except TRANSIENT_ERRORS as e:
+                    server = self._close(server)
+                    retry_or_fail(attempt, batch, e)
+                except Exception as e:
+                    print(f"Error sending to {len(batch)} recipients: {str(e)}")
+                    with results_lock:
+                        results['failed'].extend(batch)
+                finally:
+                    jobs.task_done()
+
+            self._close(server)
+
+        workers = [threading.Thread(target=worker, name=f'smtp-{i}', daemon=True)
+                   for i in range(max(1, min(self.connections, jobs.qsize())))]
+        for thread in workers:
+            thread.start()
+        jobs.join()
+        for _ in workers:
+            jobs.put(None)
+        for thread in workers:
+            thread.join()
+
+        return results
+
+    def send_newsletter(self, deck, recipients=None, html=None):
+        """Send newsletter to all configured recipients; deck is a DeckBuffer, a .pptx path,
+        or None to send only the HTML edition"""
+        try:
+            recipients = recipients or self.recipient_emails
+            message = self._build_message(deck, html)
+            results = self._deliver(message, recipients)
+
+            if results['failed']:
+                print(f"Failed to deliver to {len(results['failed'])} recipients")
+            if not results['sent']:
+                raise RuntimeError("Newsletter could not be delivered to any recipient")
             
-            print(f"Newsletter sent successfully to {len(self.recipient_emails)} recipients")
+            print(f"Newsletter sent successfully to {len(results['sent'])} recipients")
+            return results
             
         except Exception as e:
             print(f"Error sending newsletter: {str(e)}")
-            raise 
\ No newline at end of file
+            raise
\ No newline at end of file
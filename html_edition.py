@@ -0,0 +1,136 @@
+from email.mime.image import MIMEImage
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from html import escape
+from io import BytesIO
+from urllib.parse import quote
+from PIL import Image
+import hashlib
+import os
+
+# Image formats mail clients show inline, by PIL format name, with their MIME subtype
+INLINE_IMAGE_TYPES = {'JPEG': 'jpeg', 'PNG': 'png', 'GIF': 'gif'}
+
+def inline_image_subtype(data, max_size=None):
+    """MIME subtype of image bytes that can be inlined, or None for other formats,
+    undecodable data and images larger than max_size pixels"""
+    try:
+        with Image.open(BytesIO(data)) as img:
+            subtype = INLINE_IMAGE_TYPES.get(img.format)
+            width, height = img.size
+    except Exception:
+        return None
+    if max_size and (width > max_size[0] or height > max_size[1]):
+        return None
+    return subtype
+
+def publish_deck(deck):
+    """Copy the deck to DECK_PUBLISH_DIR and return its DECK_BASE_URL link, or None"""
+    base_url = os.getenv('DECK_BASE_URL')
+    if not base_url:
+        return None
+    # Named after its contents, so a later deck the same day (a digest, an edition, a daemon
+    # rerun) is published beside the one earlier emails link to instead of over it
+    stem, ext = os.path.splitext(deck.filename)
+    filename = f"{stem}_{deck.digest()[:12]}{ext}"
+    publish_dir = os.getenv('DECK_PUBLISH_DIR')
+    if publish_dir:
+        os.makedirs(publish_dir, exist_ok=True)
+        deck.save(os.path.join(publish_dir, filename))
+    return f"{base_url.rstrip('/')}/{quote(filename)}"
+
+class HTMLNewsletter:
+    def __init__(self, title, articles, quiz, joke, thumbnails=None, deck_url=None, max_thumbnail_size=None):
+        """HTML rendition of a deck's articles, quiz and joke, with inline thumbnails"""
+        self.title = title
+        self.articles = articles
+        self.quiz = quiz
+        self.joke = joke
+        self.deck_url = deck_url
+        # Thumbnail bytes by image URL; identical images share one Content-ID. Images the
+        # normalizer could not shrink or decode come back as the originals and are left out
+        thumbnails = thumbnails or {}
+        self.images = {}
+        self.cids = {}
+        for url, data in thumbnails.items():
+            subtype = inline_image_subtype(data, max_thumbnail_size)
+            if subtype is None:
+                continue
+            cid = f"{hashlib.sha1(data).hexdigest()[:20]}@newsletter"
+            self.images[cid] = (subtype, data)
+            self.cids[url] = cid
+
+    def iter_html(self):
+        """The HTML body, piece by piece"""
+        yield ('<!DOCTYPE html><html><head><meta charset="utf-8">'
+               f'<title>{escape(self.title)}</title></head>'
+               '<body style="margin:0;padding:0;background:#ecf0f1;">'
+               '<table role="presentation" width="100%" cellpadding="0" cellspacing="0">'
+               '<tr><td align="center"><table role="presentation" width="640" cellpadding="0" cellspacing="0" '
+               'style="background:#ffffff;font-family:Arial,Helvetica,sans-serif;color:#2c3e50;">')
+        yield (f'<tr><td style="background:#2980b9;color:#ffffff;padding:24px;font-size:24px;font-weight:bold;">'
+               f'{escape(self.title)}</td></tr>')
+        if self.deck_url:
+            yield (f'<tr><td style="padding:12px 24px;font-size:14px;">'
+                   f'<a href="{escape(self.deck_url)}" style="color:#2980b9;">Open the full slide deck</a></td></tr>')
+
+        for article in self.articles:
+            yield from self._iter_article(article)
+
+        for i, quiz in enumerate(self.quiz, 1):
+            yield (f'<tr><td style="padding:16px 24px;border-top:1px solid #ecf0f1;">'
+                   f'<div style="font-size:13px;color:#9b59b6;font-weight:bold;">Tech Quiz Challenge #{i}</div>'
+                   f'<div style="font-size:16px;margin:6px 0;">{escape(quiz["question"])}</div>')
+            for j, option in enumerate(quiz['options'][:4]):
+                yield f'<div style="font-size:14px;">{chr(65 + j)}. {escape(option)}</div>'
+            yield '</td></tr>'
+
+        yield (f'<tr><td style="padding:16px 24px;border-top:1px solid #ecf0f1;font-size:14px;">'
+               f'<b>Tech humor of the day:</b> {escape(self.joke)}</td></tr>')
+        yield '</table></td></tr></table></body></html>'
+
+    def _iter_article(self, article):
+        cid = self.cids.get(article.image_url)
+        url = escape(article.url or '')
+        yield '<tr><td style="padding:16px 24px;border-top:1px solid #ecf0f1;">'
+        if cid:
+            yield (f'<a href="{url}"><img src="cid:{cid}" width="120" alt="" '
+                   f'style="float:right;margin:0 0 8px 12px;border:0;"></a>')
+        yield (f'<a href="{url}" style="font-size:17px;font-weight:bold;color:#2c3e50;text-decoration:none;">'
+               f'{escape(article.title or "No Title Available")}</a>'
+               f'<div style="font-size:12px;color:#7f8c8d;margin:4px 0;">{escape(article.source or "Unknown")}</div>'
+               f'<div style="font-size:14px;line-height:1.4;">{escape(article.description or "")}</div>'
+               '</td></tr>')
+
+    @property
+    def html(self):
+        return ''.join(self.iter_html())
+
+    @property
+    def text(self):
+        """Plain text alternative for clients that do not show HTML"""
+        lines = [self.title, '']
+        if self.deck_url:
+            lines += [f"Full slide deck: {self.deck_url}", '']
+        for article in self.articles:
+            lines += [f"* {article.title} ({article.source})", f"  {article.url}"]
+        for i, quiz in enumerate(self.quiz, 1):
+            lines += ['', f"Tech Quiz Challenge #{i}: {quiz['question']}"]
+            lines += [f"  {chr(65 + j)}. {option}" for j, option in enumerate(quiz['options'][:4])]
+        lines += ['', f"Tech humor of the day: {self.joke}"]
+        return '\n'.join(lines)
+
+    def mime_part(self):
+        """multipart/alternative with the text and the HTML plus its thumbnails"""
+        related = MIMEMultipart('related')
+        related.attach(MIMEText(self.html, 'html', 'utf-8'))
+        for cid, (subtype, data) in self.images.items():
+            image = MIMEImage(data, subtype)
+            image['Content-ID'] = f"<{cid}>"
+            image['Content-Disposition'] = 'inline'
+            related.attach(image)
+
+        alternative = MIMEMultipart('alternative')
+        alternative.attach(MIMEText(self.text, 'plain', 'utf-8'))
+        alternative.attach(related)
+        return alternative
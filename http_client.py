@@ -0,0 +1,145 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlsplit
+import os
+import random
+import threading
+import time
+
+# Methods that are safe to send again after a failed attempt
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+# Responses worth another attempt; anything else is returned to the caller as is
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised instead of contacting a host whose circuit breaker is open"""
+
+class CircuitBreaker:
+    def __init__(self, host, threshold, cooldown):
+        """Fail fast on a host after threshold consecutive failures, trying again after cooldown seconds"""
+        self.host = host
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def before_request(self):
+        """Raise CircuitOpenError unless a request to the host may go ahead"""
+        with self._lock:
+            if self.opened_at is None:
+                return
+            # Half open: once the cooldown has passed, one trial request goes through
+            # and the cooldown starts again in case it fails too
+            if time.monotonic() - self.opened_at >= self.cooldown:
+                self.opened_at = time.monotonic()
+                return
+        raise CircuitOpenError(f"Circuit open for {self.host} after {self.failures} failures")
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                if self.opened_at is None:
+                    print(f"Circuit opened for {self.host} after {self.failures} failures")
+                self.opened_at = time.monotonic()
+
+    @property
+    def is_open(self):
+        with self._lock:
+            return self.opened_at is not None
+
+class ResilientAdapter(HTTPAdapter):
+    def __init__(self, pool_size=None, timeout=None, max_retries=None, backoff=None,
+                 retry_budget=None, breaker_threshold=None, breaker_cooldown=None):
+        """Pooled transport adding default timeouts, jittered retries and per-host circuit breakers"""
+        pool_size = pool_size or int(os.getenv('HTTP_POOL_SIZE', 32))
+        super().__init__(pool_connections=pool_size, pool_maxsize=pool_size)
+        # (connect, read) seconds, used when a caller does not pass its own
+        self.timeout = timeout or (float(os.getenv('HTTP_CONNECT_TIMEOUT', 5)),
+                                   float(os.getenv('HTTP_READ_TIMEOUT', 15)))
+        self.retries = max_retries if max_retries is not None else int(os.getenv('HTTP_MAX_RETRIES', 2))
+        self.backoff = backoff if backoff is not None else float(os.getenv('HTTP_BACKOFF', 0.5))
+        # No retry starts once a request has taken this many seconds
+        self.retry_budget = retry_budget or float(os.getenv('HTTP_RETRY_BUDGET', 20))
+        self.breaker_threshold = breaker_threshold or int(os.getenv('HTTP_BREAKER_THRESHOLD', 5))
+        self.breaker_cooldown = breaker_cooldown or float(os.getenv('HTTP_BREAKER_COOLDOWN', 60))
+        self.breakers = {}
+        self._breakers_lock = threading.Lock()
+
+    def breaker(self, url):
+        """Circuit breaker of the host of url"""
+        host = urlsplit(url).netloc.lower()
+        with self._breakers_lock:
+            if host not in self.breakers:
+                self.breakers[host] = CircuitBreaker(host, self.breaker_threshold, self.breaker_cooldown)
+            return self.breakers[host]
+
+    def _delay(self, attempt, response=None):
+        """Seconds to wait before the next attempt: full-jitter exponential backoff or Retry-After"""
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        return random.uniform(0, self.backoff * 2 ** attempt)
+
+    def send(self, request, timeout=None, **kwargs):
+        breaker = self.breaker(request.url)
+        breaker.before_request()
+        attempts = self.retries + 1 if request.method in IDEMPOTENT_METHODS else 1
+        # Worst case per request: the retry budget plus one attempt's timeouts
+        deadline = time.monotonic() + self.retry_budget
+
+        for attempt in range(attempts):
+            try:
+                response = super().send(request, timeout=timeout or self.timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                breaker.record_failure()
+                delay = self._delay(attempt)
+                if not self._may_retry(attempt, attempts, deadline, delay, breaker):
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    breaker.record_success()
+                    return response
+                breaker.record_failure()
+                delay = self._delay(attempt, response)
+                if not self._may_retry(attempt, attempts, deadline, delay, breaker):
+                    return response
+                response.close()
+            time.sleep(delay)
+
+    def _may_retry(self, attempt, attempts, deadline, delay, breaker):
+        return attempt + 1 < attempts and not breaker.is_open and time.monotonic() + delay < deadline
+
+_session = None
+_session_lock = threading.Lock()
+
+def new_session(**adapter_options):
+    """A session of its own, for callers that need other adapter settings than the shared one"""
+    session = requests.Session()
+    adapter = ResilientAdapter(**adapter_options)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+def get_session():
+    """The process-wide HTTP session, so connections and TLS sessions are reused by every caller"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = new_session()
+        return _session
+
+def _forget_session():
+    # Connections inherited by a forked worker belong to the parent
+    global _session, _session_lock
+    _session = None
+    _session_lock = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget_session)
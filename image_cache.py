@@ -0,0 +1,119 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from cache_paths import newsletter_cache_dir
+
+class ImageCache:
+    def __init__(self, cache_dir=None, max_bytes=None, max_age=None):
+        """On-disk image cache keyed by URL, storing each distinct image once by content hash"""
+        self.cache_dir = os.path.join(cache_dir or newsletter_cache_dir(), 'images')
+        # Total size of stored images before least recently used ones are evicted
+        self.max_bytes = max_bytes or int(os.getenv('IMAGE_CACHE_MAX_BYTES', 200 * 1024 * 1024))
+        # Seconds an entry is served without revalidating it against the origin
+        self.max_age = max_age if max_age is not None else int(os.getenv('IMAGE_CACHE_MAX_AGE', 24 * 3600))
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(self.cache_dir, 'index.sqlite3'), check_same_thread=False)
+        with self._db:
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS urls (
+                    url TEXT PRIMARY KEY,
+                    content_hash TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    validated_at REAL NOT NULL
+                )""")
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS blobs (
+                    content_hash TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL
+                )""")
+
+    def _blob_path(self, content_hash):
+        """Path of the file holding an image's bytes"""
+        return os.path.join(self.cache_dir, content_hash[:2], content_hash)
+
+    def get(self, url):
+        """Return the cached entry for a URL as a dict, or None if it is not cached"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT content_hash, etag, last_modified, validated_at FROM urls WHERE url = ?",
+                (url,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            content_hash, etag, last_modified, validated_at = row
+            try:
+                with open(self._blob_path(content_hash), 'rb') as f:
+                    data = f.read()
+            except OSError:
+                # The blob was removed behind our back, forget the entry
+                with self._db:
+                    self._db.execute("DELETE FROM urls WHERE url = ?", (url,))
+                return None
+
+            with self._db:
+                self._db.execute("UPDATE blobs SET last_access = ? WHERE content_hash = ?",
+                                 (time.time(), content_hash))
+
+        return {
+            'data': data,
+            'etag': etag,
+            'last_modified': last_modified,
+            'fresh': time.time() - validated_at < self.max_age
+        }
+
+    def put(self, url, data, etag=None, last_modified=None):
+        """Store downloaded image bytes for a URL"""
+        content_hash = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(content_hash)
+        now = time.time()
+
+        with self._lock:
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+
+            with self._db:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO blobs (content_hash, size, last_access) VALUES (?, ?, ?)",
+                    (content_hash, len(data), now)
+                )
+                self._db.execute(
+                    "INSERT OR REPLACE INTO urls (url, content_hash, etag, last_modified, validated_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (url, content_hash, etag, last_modified, now)
+                )
+            self._evict()
+
+    def mark_validated(self, url):
+        """Record that the origin confirmed the cached copy is still current"""
+        with self._lock, self._db:
+            self._db.execute("UPDATE urls SET validated_at = ? WHERE url = ?", (time.time(), url))
+
+    def _evict(self):
+        """Drop least recently used images until the cache fits its size cap"""
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = self._db.execute("SELECT content_hash, size FROM blobs ORDER BY last_access").fetchall()
+        with self._db:
+            for content_hash, size in rows:
+                if total <= self.max_bytes:
+                    break
+                self._db.execute("DELETE FROM blobs WHERE content_hash = ?", (content_hash,))
+                self._db.execute("DELETE FROM urls WHERE content_hash = ?", (content_hash,))
+                try:
+                    os.remove(self._blob_path(content_hash))
+                except OSError:
+                    pass
+                total -= size
@@ -0,0 +1,59 @@
+from concurrent.futures import ThreadPoolExecutor
+import os
+from instrumentation import metrics
+import http_client
+
+class ImagePrefetcher:
+    def __init__(self, max_workers=None, timeout=(5, 15), cache=None, session=None):
+        """Downloads slide images in parallel over the shared HTTP session"""
+        self.max_workers = max_workers or int(os.getenv('IMAGE_FETCH_WORKERS', 8))
+        self.timeout = timeout
+        # Optional ImageCache consulted before going to the network
+        self.cache = cache
+        # Retries slow hosts with backoff and fails fast on hosts that keep failing
+        self.session = session or http_client.get_session()
+
+    def fetch(self, url, use_cache=True):
+        """Download a single image and return its bytes, or None on failure"""
+        cache = self.cache if use_cache else None
+        cached = cache.get(url) if cache else None
+        if cached and cached['fresh']:
+            return cached['data']
+
+        # Revalidate a stale cached copy instead of downloading it again
+        headers = {}
+        if cached:
+            if cached['etag']:
+                headers['If-None-Match'] = cached['etag']
+            if cached['last_modified']:
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        try:
+            with metrics.stage('image_download'):
+                response = self.session.get(url, headers=headers, timeout=self.timeout)
+            metrics.add_bytes('image_download', len(response.content))
+            if cached and response.status_code == 304:
+                self.cache.mark_validated(url)
+                return cached['data']
+
+            response.raise_for_status()
+            if cache:
+                cache.put(url, response.content,
+                               etag=response.headers.get('ETag'),
+                               last_modified=response.headers.get('Last-Modified'))
+            return response.content
+        except Exception as e:
+            print(f"Error downloading image {url}: {str(e)}")
+            # A stale copy is still better than no image at all
+            return cached['data'] if cached else None
+
+    def prefetch(self, urls):
+        """Download all unique URLs concurrently and return a url -> bytes map"""
+        unique_urls = list(dict.fromkeys(url for url in urls if url))
+        if not unique_urls:
+            return {}
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(unique_urls)),
+                                thread_name_prefix='image') as executor:
+            results = executor.map(self.fetch, unique_urls)
+            return {url: data for url, data in zip(unique_urls, results) if data is not None}
@@ -0,0 +1,71 @@
+from PIL import Image, ImageOps
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import os
+
+class ImageNormalizer:
+    def __init__(self, dpi=None, jpeg_quality=None, cache=None):
+        """Downscale and recompress images to the size they are shown at on a slide"""
+        self.dpi = dpi or int(os.getenv('IMAGE_DPI', 150))
+        self.jpeg_quality = jpeg_quality or int(os.getenv('IMAGE_JPEG_QUALITY', 80))
+        # Optional ImageCache used to keep normalized results between runs
+        self.cache = cache
+
+    def _cache_key(self, data, width_in, height_in):
+        """Cache key covering the source bytes and every output setting"""
+        digest = hashlib.sha256(data).hexdigest()
+        return f"normalized://{digest}/cover-{width_in}x{height_in}@{self.dpi}dpi/q{self.jpeg_quality}"
+
+    def _has_alpha(self, img):
+        """Whether the image uses transparency and therefore has to stay PNG"""
+        return img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info)
+
+    def normalize(self, data, width_in, height_in):
+        """Return image bytes sized for a width_in x height_in inch box"""
+        key = self._cache_key(data, width_in, height_in)
+        if self.cache:
+            cached = self.cache.get(key)
+            if cached:
+                return cached['data']
+
+        try:
+            with Image.open(BytesIO(data)) as img:
+                img.load()
+                # Slides crop pictures to fill their box, so shrink to cover the box at the target
+                # DPI and crop the overflow from the centre; never enlarge, so an image too small
+                # to cover the box is only cropped to its shape
+                box_w, box_h = int(width_in * self.dpi), int(height_in * self.dpi)
+                scale = max(box_w / img.width, box_h / img.height, 1)
+                size = (max(min(round(box_w / scale), img.width), 1), max(min(round(box_h / scale), img.height), 1))
+                img = ImageOps.fit(img, size, Image.LANCZOS)
+
+                output = BytesIO()
+                if self._has_alpha(img):
+                    img.save(output, format='PNG', optimize=True)
+                else:
+                    img.convert('RGB').save(output, format='JPEG', quality=self.jpeg_quality,
+                                            optimize=True, progressive=True)
+                normalized = output.getvalue()
+        except Exception as e:
+            print(f"Error normalizing image: {str(e)}")
+            return data
+
+        # Keep the original if recompressing did not make it smaller
+        if len(normalized) >= len(data):
+            normalized = data
+
+        if self.cache:
+            self.cache.put(key, normalized)
+        return normalized
+
+    def normalize_all(self, images, width_in, height_in):
+        """Normalize a url -> bytes map for one box size in parallel"""
+        if not images:
+            return {}
+
+        urls = list(images)
+        with ThreadPoolExecutor(max_workers=min(len(urls), os.cpu_count() or 1),
+                                thread_name_prefix='normalize') as executor:
+            results = executor.map(lambda url: self.normalize(images[url], width_in, height_in), urls)
+            return dict(zip(urls, results))
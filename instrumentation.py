@@ -0,0 +1,147 @@
+from contextlib import contextmanager
+import cProfile
+import json
+import os
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+
+def _escape(value):
+    """Escape a Prometheus label value"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def peak_rss_bytes():
+    """Highest resident set size the process has reached"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak * (1 if sys.platform == 'darwin' else 1024)
+
+def rss_bytes():
+    """Current resident set size, or the peak where the platform does not report it"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return peak_rss_bytes()
+
+class Metrics:
+    def __init__(self):
+        """Wall time, bytes and peak memory recorded per pipeline stage"""
+        self._lock = threading.Lock()
+        # (stage, sorted label items) -> aggregated figures
+        self._stages = {}
+
+    def _entry(self, name, labels):
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        entry = self._stages.get(key)
+        if entry is None:
+            entry = self._stages[key] = {
+                'count': 0, 'errors': 0, 'seconds': 0.0, 'max_seconds': 0.0,
+                'bytes': 0, 'peak_memory_bytes': 0
+            }
+        return entry
+
+    @contextmanager
+    def stage(self, name, memory=False, **labels):
+        """Time a block of work; labels tell apart sources, slide kinds or editions"""
+        if memory and tracemalloc.is_tracing():
+            # Peaks are only per stage for stages that do not overlap, so memory is opt-in
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            seconds = time.perf_counter() - start
+            peak = 0
+            if memory:
+                if tracemalloc.is_tracing():
+                    peak = tracemalloc.get_traced_memory()[1]
+                else:
+                    # Without tracemalloc the process high-water mark is the best we have
+                    peak = peak_rss_bytes()
+            with self._lock:
+                entry = self._entry(name, labels)
+                entry['count'] += 1
+                entry['errors'] += failed
+                entry['seconds'] += seconds
+                entry['max_seconds'] = max(entry['max_seconds'], seconds)
+                entry['peak_memory_bytes'] = max(entry['peak_memory_bytes'], peak)
+
+    def add_bytes(self, name, size, **labels):
+        """Count bytes transferred or written by a stage"""
+        with self._lock:
+            self._entry(name, labels)['bytes'] += size
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+
+    def summary(self):
+        """Every recorded stage as a list of dicts"""
+        with self._lock:
+            return [dict(entry, stage=name, labels=dict(labels), seconds=round(entry['seconds'], 6),
+                         max_seconds=round(entry['max_seconds'], 6))
+                    for (name, labels), entry in sorted(self._stages.items())]
+
+    def to_json(self):
+        return json.dumps({'generated_at': time.time(), 'stages': self.summary()}, indent=2)
+
+    def to_prometheus(self):
+        """Prometheus text exposition format"""
+        series = [
+            ('newsletter_stage_seconds_total', 'counter', 'Wall time spent in a stage', 'seconds'),
+            ('newsletter_stage_max_seconds', 'gauge', 'Slowest single run of a stage', 'max_seconds'),
+            ('newsletter_stage_runs_total', 'counter', 'Times a stage ran', 'count'),
+            ('newsletter_stage_errors_total', 'counter', 'Times a stage raised', 'errors'),
+            ('newsletter_stage_bytes_total', 'counter', 'Bytes transferred or written by a stage', 'bytes'),
+            ('newsletter_stage_peak_memory_bytes', 'gauge', 'Peak memory while a stage ran', 'peak_memory_bytes')
+        ]
+        stages = self.summary()
+        lines = []
+        for metric, kind, help_text, field in series:
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for entry in stages:
+                labels = dict(entry['labels'], stage=entry['stage'])
+                label_text = ','.join(f'{key}="{_escape(value)}"' for key, value in sorted(labels.items()))
+                lines.append(f"{metric}{{{label_text}}} {entry[field]}")
+        return '\n'.join(lines) + '\n'
+
+    def export(self, path):
+        """Write the metrics to path, as Prometheus text for .prom/.txt files and JSON otherwise"""
+        text = self.to_prometheus() if path.endswith(('.prom', '.txt')) else self.to_json()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        return path
+
+# Shared by every module of the pipeline
+metrics = Metrics()
+
+@contextmanager
+def profile(path_prefix, top=25):
+    """Run a block under cProfile and tracemalloc, writing <prefix>.prof and <prefix>.memory.txt"""
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(f"{path_prefix}.prof")
+
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        if started_tracing:
+            tracemalloc.stop()
+        with open(f"{path_prefix}.memory.txt", 'w', encoding='utf-8') as f:
+            f.write(f"current: {current} bytes\npeak: {peak} bytes\n\n")
+            for stat in snapshot.statistics('lineno')[:top]:
+                f.write(f"{stat}\n")
+        print(f"Profile written to {path_prefix}.prof and {path_prefix}.memory.txt")
@@ -1,46 +1,78 @@
-from multi_source_fetcher import MultiSourceFetcher
-from ppt_generator import PPTGenerator
-from email_sender import EmailSender
 from content_generator import ContentGenerator
+from pipeline import NewsletterPipeline, run_daemon
+from instrumentation import metrics, profile
+import source_registry
+from datetime import datetime
+import argparse
 import os
 from dotenv import load_dotenv
 
-def generate_and_send_newsletter():
+def generate_and_send_newsletter(pipeline=None):
     """Generate and send the tech newsletter to all configured recipients"""
-    try:
-        print("Starting newsletter generation...")
-        
-        # Initialize components
-        fetcher = MultiSourceFetcher()
-        ppt_gen = PPTGenerator()
-        email_sender = EmailSender()
-        
-        # Fetch news articles
-        print("Fetching news articles...")
-        articles = fetcher.fetch_all_news()
-        
-        if not articles:
-            print("No articles found. Skipping newsletter generation.")
-            return
-        
-        # Generate PowerPoint presentation
-        pptx_file = ppt_gen.generate_presentation(articles)
-        print(f"PowerPoint presentation generated: {pptx_file}")
-        
-        # Send newsletter to all configured recipients
-        email_sender.send_newsletter(pptx_file)
-        print("Newsletter sent successfully!")
-        
-        # Clean up the generated file
-        try:
-            os.remove(pptx_file)
-            print(f"Cleaned up temporary file: {pptx_file}")
-        except Exception as e:
-            print(f"Error cleaning up file {pptx_file}: {str(e)}")
-            
-    except Exception as e:
-        print(f"Error generating/sending newsletter: {str(e)}")
+    (pipeline or NewsletterPipeline()).run()
+
+def generate_and_send_editions(editions_file=None, pipeline=None):
+    """Fetch once, then render and send every edition to its own recipient group"""
+    (pipeline or NewsletterPipeline()).run_editions(editions_file)
+
+def generate_and_send_digest(pipeline=None):
+    """Send one deck covering every fetched story, rendered in bounded memory"""
+    (pipeline or NewsletterPipeline()).run_digest()
 
 if __name__ == "__main__":
-    print("Generating and sending tech newsletter...")
-    generate_and_send_newsletter() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Generate and send the tech newsletter")
+    parser.add_argument('--editions', nargs='?', const=os.getenv('EDITIONS_FILE', 'editions.json'),
+                        help="Render one deck per edition defined in this JSON file")
+    parser.add_argument('--digest', action='store_true',
+                        help="Send a digest with a slide for every story (up to DIGEST_MAX_ARTICLES), "
+                             "streaming images so memory stays flat")
+    parser.add_argument('--metrics', default=os.getenv('METRICS_FILE'),
+                        help="Write per-stage timings to this file (.prom for Prometheus text, JSON otherwise)")
+    parser.add_argument('--profile', action='store_true',
+                        help="Run under cProfile and tracemalloc, writing the results next to the deck")
+    parser.add_argument('--import-report', action='store_true',
+                        help="Print how long each lazily loaded source and provider took to import")
+    parser.add_argument('--daemon', action='store_true',
+                        help="Stay resident and send on a schedule, keeping connections and caches warm")
+    parser.add_argument('--at', default=os.getenv('NEWSLETTER_SCHEDULE', '08:00'),
+                        help="Comma-separated daily HH:MM run times for --daemon")
+    parser.add_argument('--every', type=int, default=int(os.getenv('NEWSLETTER_INTERVAL_MINUTES', 0)) or None,
+                        help="Run every N minutes in --daemon mode instead of at fixed times")
+    args = parser.parse_args()
+    if args.daemon and args.profile:
+        parser.error("--profile cannot be combined with --daemon, which never exits")
+
+    def report():
+        if args.metrics:
+            print(f"Metrics written to {metrics.export(args.metrics)}")
+        if args.import_report:
+            print("Import times of lazily loaded backends:")
+            print(source_registry.import_report())
+
+    def job(pipeline=None):
+        print("Generating and sending tech newsletter...")
+        if args.digest:
+            generate_and_send_digest(pipeline)
+        elif args.editions:
+            generate_and_send_editions(args.editions, pipeline)
+        else:
+            generate_and_send_newsletter(pipeline)
+        if args.daemon:
+            # The daemon never returns, so each run writes its own figures and starts afresh
+            report()
+            metrics.reset()
+
+    def run():
+        if args.daemon:
+            times = [] if args.every else [at.strip() for at in args.at.split(',') if at.strip()]
+            run_daemon(job, times=times, every_minutes=args.every)
+        else:
+            job()
+
+    if args.profile:
+        # Named like the deck, which is written to the working directory
+        with profile(f"tech_news_{datetime.now().strftime('%Y%m%d')}"):
+            run()
+    else:
+        run()
+    report() 
\ No newline at end of file
@@ -1,48 +1,57 @@
-import wikipedia
-import feedparser
-from bs4 import BeautifulSoup
-import requests
-from datetime import datetime, timedelta
+from article import Article
 import os
 from dotenv import load_dotenv
-from newsapi import NewsApiClient
-import json
-from datetime import timezone
+from deduplicator import ArticleDeduplicator
+from seen_store import SeenStore
+from instrumentation import metrics
+import source_registry
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 
 load_dotenv()
 
 class MultiSourceFetcher:
-    def __init__(self):
+    # Seconds each source may take, measured from the start of fetch_all_news
+    DEFAULT_DEADLINES = {
+        'newsapi': 20,
+        'wikipedia': 20,
+        'rss': 20
+    }
+
+    def __init__(self, deadlines=None, seen_store=None):
+        # Per-request network timeout (connect, read) for HTTP calls made here
+        self.request_timeout = (5, float(os.getenv('FETCH_TIMEOUT', 10)))
+        self.deadlines = dict(self.DEFAULT_DEADLINES)
+        if deadlines:
+            self.deadlines.update(deadlines)
+        self.deduplicator = ArticleDeduplicator()
+        # Holds feed ETag/Last-Modified values between runs
+        self.seen_store = seen_store or SeenStore()
         self.setup_apis()
 
     def setup_apis(self):
-        """Setup API clients for different sources"""
-        # NewsAPI setup
-        self.newsapi = NewsApiClient(api_key=os.getenv('NEWS_API_KEY'))
+        """Configure the source backends; each is only imported once it is fetched from"""
+        self.enabled_sources = source_registry.enabled_sources()
+        self.source_options = {
+            'newsapi': {'api_key': os.getenv('NEWS_API_KEY')},
+            # Wikipedia topics come from WIKIPEDIA_TOPICS, resolved in batched queries
+            'wikipedia': {'timeout': self.request_timeout},
+            # Feeds are listed in FEEDS_FILE, Times of India only when there is none
+            'rss': {'seen_store': self.seen_store, 'timeout': self.request_timeout}
+        }
+        self._backends = {}
+
+    def source(self, name):
+        """Return a source backend, importing and creating it on first use"""
+        if name not in self._backends:
+            self._backends[name] = source_registry.load_source(name)(**self.source_options[name])
+        return self._backends[name]
 
     def fetch_newsapi_articles(self):
         """Fetch articles from NewsAPI"""
         try:
-            yesterday = datetime.now(timezone.utc) - timedelta(days=1)
-            yesterday_str = yesterday.strftime('%Y-%m-%d')
-            
-            tech_news = self.newsapi.get_everything(
-                q='technology OR artificial intelligence OR programming OR cybersecurity',
-                language='en',
-                from_param=yesterday_str,
-                sort_by='relevancy',
-                page_size=5
-            )
-            
-            return [{
-                'title': article['title'],
-                'description': article['description'],
-                'url': article['url'],
-                'source': article['source']['name'],
-                'published_at': article['publishedAt'],
-                'urlToImage': article.get('urlToImage', None),
-                'type': 'news'
-            } for article in tech_news['articles']]
+            return self.source('newsapi').fetch()
         except Exception as e:
             print(f"Error fetching from NewsAPI: {str(e)}")
             return []
@@ -50,75 +59,88 @@ class MultiSourceFetcher:
     def fetch_wikipedia_tech(self):
         """Fetch latest technology articles from Wikipedia"""
         try:
-            tech_topics = ["Artificial intelligence", "Machine learning", 
-                          "Cloud computing", "Blockchain"]
-            wiki_articles = []
-            
-            for topic in tech_topics:
-                try:
-                    page = wikipedia.page(topic)
-                    summary = wikipedia.summary(topic, sentences=2)
-                    
-                    wiki_articles.append({
-                        'title': f"Wikipedia: {page.title}",
-                        'description': summary,
-                        'url': page.url,
-                        'source': 'Wikipedia',
-                        'published_at': datetime.now(timezone.utc).isoformat(),
-                        'urlToImage': None,
-                        'type': 'wikipedia'
-                    })
-                except:
-                    continue
-            return wiki_articles
+            return self.source('wikipedia').fetch()
         except Exception as e:
             print(f"Error fetching from Wikipedia: {str(e)}")
             return []
 
-    def fetch_times_of_india(self):
-        """Fetch technology news from Times of India RSS feed"""
+    def fetch_rss_feeds(self):
+        """Fetch technology news from every configured RSS feed"""
         try:
-            toi_tech_feed = "https://timesofindia.indiatimes.com/rssfeeds/66949542.cms"
-            feed = feedparser.parse(toi_tech_feed)
-            
-            articles = []
-            for entry in feed.entries[:5]:
-                # Clean up HTML content using BeautifulSoup
-                soup = BeautifulSoup(entry.summary, 'html.parser')
-                clean_description = soup.get_text().strip()
-                
-                # Remove any HTML from title as well
-                title_soup = BeautifulSoup(entry.title, 'html.parser')
-                clean_title = title_soup.get_text().strip()
-                
-                articles.append({
-                    'title': clean_title,
-                    'description': clean_description,
-                    'url': entry.link,
-                    'source': 'Times of India',
-                    'published_at': datetime.now(timezone.utc).isoformat(),
-                    'urlToImage': None,
-                    'type': 'times_of_india'
-                })
-            
-            return articles
+            return self.source('rss').fetch()
         except Exception as e:
-            print(f"Error fetching from Times of India: {str(e)}")
+            print(f"Error fetching RSS feeds: {str(e)}")
             return []
 
-    def fetch_all_news(self):
-        """Fetch news from all sources"""
+    def _sources(self):
+        """Map enabled source names to their fetch methods"""
+        fetchers = {
+            'newsapi': self.fetch_newsapi_articles,
+            'wikipedia': self.fetch_wikipedia_tech,
+            'rss': self.fetch_rss_feeds
+        }
+        return {name: fetchers[name] for name in self.enabled_sources}
+
+    def _timed(self, name, fetch):
+        """Run one source's fetch method, recording how long it took"""
+        with metrics.stage('source', source=name):
+            return fetch()
+
+    def _fetch_sequential(self):
+        """Fetch every source one after another"""
         all_articles = []
-        
+        for name, fetch in self._sources().items():
+            all_articles.extend(self._timed(name, fetch))
+        return all_articles
+
+    def _fetch_concurrent(self):
+        """Fetch all sources in parallel, keeping whatever meets its deadline"""
+        sources = self._sources()
+        # Import backends here rather than racing to import them in the worker threads
+        for name in sources:
+            try:
+                self.source(name)
+            except Exception as e:
+                print(f"Error loading source {name}: {str(e)}")
+        start = time.monotonic()
+        executor = ThreadPoolExecutor(max_workers=len(sources), thread_name_prefix='fetch')
+        futures = {name: executor.submit(self._timed, name, fetch) for name, fetch in sources.items()}
+
+        all_articles = []
+        try:
+            # Collect in deadline order so a slow source never delays a faster one
+            for name in sorted(futures, key=lambda n: self.deadlines.get(n, 0)):
+                remaining = start + self.deadlines.get(name, 0) - time.monotonic()
+                try:
+                    articles = futures[name].result(timeout=max(remaining, 0))
+                    all_articles.extend(articles)
+                    print(f"Fetched {len(articles)} articles from {name} "
+                          f"in {time.monotonic() - start:.2f}s")
+                except FutureTimeoutError:
+                    print(f"Skipping {name}: missed its {self.deadlines.get(name)}s deadline")
+                except Exception as e:
+                    print(f"Error fetching from {name}: {str(e)}")
+        finally:
+            # Do not wait for sources that missed their deadline
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return all_articles
+
+    def fetch_all_news(self, concurrent=True):
+        """Fetch news from all sources"""
         # Fetch from all sources
-        all_articles.extend(self.fetch_newsapi_articles())
-        all_articles.extend(self.fetch_wikipedia_tech())
-        all_articles.extend(self.fetch_times_of_india())
+        if concurrent:
+            all_articles = self._fetch_concurrent()
+        else:
+            all_articles = self._fetch_sequential()
+
+        # Drop stories syndicated across several sources
+        fetched_count = len(all_articles)
+        all_articles = self.deduplicator.deduplicate(all_articles)
+        if len(all_articles) < fetched_count:
+            print(f"Removed {fetched_count - len(all_articles)} duplicate articles")
         
-        # Sort by published date
-        all_articles.sort(
-            key=lambda x: datetime.fromisoformat(x['published_at'].replace('Z', '+00:00')),
-            reverse=True
-        )
+        # Sort by published date, newest first
+        all_articles.sort(key=Article.sort_key, reverse=True)
         
-        return all_articles 
\ No newline at end of file
+        return all_articles
@@ -0,0 +1,181 @@
+from newsapi import NewsApiClient
+from newsapi import const as newsapi_const
+from newsapi.newsapi_exception import NewsAPIException
+from article import Article, parse_timestamp
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone
+import hashlib
+import json
+import os
+import threading
+import time
+import http_client
+from cache_paths import newsletter_cache_dir
+
+DEFAULT_QUERIES = ['technology OR artificial intelligence OR programming OR cybersecurity']
+
+def article_from_newsapi(item):
+    """Article from one entry of a NewsAPI response"""
+    return Article(
+        title=item['title'],
+        description=item['description'],
+        url=item['url'],
+        source=item['source']['name'],
+        published=parse_timestamp(item['publishedAt']),
+        image_url=item.get('urlToImage')
+    )
+
+class QuotaExhausted(RuntimeError):
+    """Raised instead of sending a request once the day's NewsAPI quota is used up"""
+
+class NewsAPISource:
+    def __init__(self, api_key=None, queries=None, cache_dir=None):
+        """NewsAPI backend running several topic queries within a daily request quota"""
+        # Every attempt counts against the quota, so retries are left to the next run
+        # rather than made behind _spend_request's back
+        self.newsapi = NewsApiClient(api_key=api_key or os.getenv('NEWS_API_KEY'),
+                                     session=http_client.new_session(max_retries=0))
+        # Endpoint override, e.g. for the local stand-in servers used by the benchmarks
+        if os.getenv('NEWSAPI_URL'):
+            newsapi_const.EVERYTHING_URL = os.getenv('NEWSAPI_URL')
+
+        if queries is None:
+            # Queries contain commas and ORs, so NEWSAPI_QUERIES separates them with semicolons
+            configured = os.getenv('NEWSAPI_QUERIES', '')
+            queries = [query.strip() for query in configured.split(';') if query.strip()]
+        self.queries = queries or list(DEFAULT_QUERIES)
+        self.language = os.getenv('NEWSAPI_LANGUAGE', 'en')
+        self.sort_by = os.getenv('NEWSAPI_SORT_BY', 'relevancy')
+        self.page_size = int(os.getenv('NEWSAPI_PAGE_SIZE', 20))
+        # Pages each query may request per run
+        self.max_pages = int(os.getenv('NEWSAPI_MAX_PAGES', 2))
+        self.lookback_hours = float(os.getenv('NEWSAPI_LOOKBACK_HOURS', 24))
+        # Window ends are rounded down to this, so runs close together share a window
+        self.window_minutes = int(os.getenv('NEWSAPI_WINDOW_MINUTES', 15))
+        # Seconds a response is served from the cache
+        self.cache_ttl = int(os.getenv('NEWSAPI_CACHE_TTL', 3600))
+        # Requests the API key may make per day (the developer plan allows 100)
+        self.daily_quota = int(os.getenv('NEWSAPI_DAILY_QUOTA', 100))
+
+        cache_dir = cache_dir or newsletter_cache_dir()
+        os.makedirs(cache_dir, exist_ok=True)
+        self.state_file = os.path.join(cache_dir, 'newsapi.json')
+        self._lock = threading.Lock()
+
+    def _load_state(self):
+        """Quota usage, cached responses and each query's fetched window"""
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {}
+        state.setdefault('quota', {'day': None, 'used': 0})
+        state.setdefault('responses', {})
+        state.setdefault('windows', {})
+        return state
+
+    def _save_state(self, state):
+        """Write the state atomically, dropping expired responses"""
+        now = time.time()
+        state['responses'] = {key: entry for key, entry in state['responses'].items()
+                              if now - entry['fetched_at'] < self.cache_ttl}
+        tmp_file = f"{self.state_file}.{os.getpid()}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp_file, self.state_file)
+
+    def remaining_quota(self, state):
+        """Requests left today"""
+        quota = state['quota']
+        if quota['day'] != date.today().isoformat():
+            return self.daily_quota
+        return max(self.daily_quota - quota['used'], 0)
+
+    def _spend_request(self, state):
+        """Count one request against today's quota, or raise QuotaExhausted"""
+        with self._lock:
+            today = date.today().isoformat()
+            if state['quota']['day'] != today:
+                state['quota'] = {'day': today, 'used': 0}
+            if state['quota']['used'] >= self.daily_quota:
+                raise QuotaExhausted("NewsAPI daily quota used up")
+            state['quota']['used'] += 1
+
+    def _page(self, state, query, window, page):
+        """One page of results for a query and window, from the cache when it is fresh"""
+        start, end = (datetime.fromtimestamp(t, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S') for t in window)
+        params = {'q': query, 'from_param': start, 'to': end, 'language': self.language,
+                  'sort_by': self.sort_by, 'page_size': self.page_size, 'page': page}
+        key = hashlib.sha1(json.dumps(params, sort_keys=True).encode('utf-8')).hexdigest()
+        with self._lock:
+            cached = state['responses'].get(key)
+        if cached and time.time() - cached['fetched_at'] < self.cache_ttl:
+            return cached['body']
+
+        self._spend_request(state)
+        try:
+            body = self.newsapi.get_everything(**params)
+        except NewsAPIException as e:
+            if e.get_code() == 'rateLimited':
+                # The API has stopped counting for us; nothing more is to be had today
+                with self._lock:
+                    state['quota']['used'] = self.daily_quota
+                raise QuotaExhausted(e.get_message()) from e
+            raise
+        with self._lock:
+            state['responses'][key] = {'fetched_at': time.time(), 'body': body}
+        return body
+
+    def _fetch_query(self, state, query, now):
+        """Articles for one query over the lookback period, requesting only what earlier runs did not"""
+        window_end = int(now // (self.window_minutes * 60) * self.window_minutes * 60)
+        lookback_start = int(now - self.lookback_hours * 3600)
+        with self._lock:
+            previous = state['windows'].get(query)
+        stored = {}
+        window_start = lookback_start
+        if previous and previous['to'] > lookback_start:
+            # Earlier runs already fetched up to previous['to']; only the rest is new
+            window_start = previous['to']
+            stored = {item['url']: item for item in previous['articles']
+                      if item['published'] >= lookback_start}
+
+        fetched = []
+        if window_start < window_end:
+            try:
+                for page in range(1, self.max_pages + 1):
+                    body = self._page(state, query, (window_start, window_end), page)
+                    fetched.extend(item for item in body['articles'] if item.get('title') != '[Removed]')
+                    if len(body['articles']) < self.page_size or page * self.page_size >= body.get('totalResults', 0):
+                        break
+            except Exception as e:
+                # Quota, API errors, non-JSON error pages and connection failures alike;
+                # the other queries' results still count
+                print(f"NewsAPI query '{query}' stopped early: {str(e)}")
+                # Keep what was fetched, but leave the window open; its cached pages cost nothing next run
+                window_end = window_start
+
+        for item in fetched:
+            article = article_from_newsapi(item)
+            stored[article.url] = article.to_dict()
+        with self._lock:
+            state['windows'][query] = {'to': max(window_end, previous['to'] if previous else 0),
+                                       'articles': list(stored.values())}
+        return [Article.from_dict(item) for item in stored.values()]
+
+    def fetch(self):
+        """Run every configured query concurrently and return their articles, each URL once"""
+        state = self._load_state()
+        now = time.time()
+        try:
+            with ThreadPoolExecutor(max_workers=len(self.queries), thread_name_prefix='newsapi') as executor:
+                results = list(executor.map(lambda query: self._fetch_query(state, query, now), self.queries))
+        finally:
+            self._save_state(state)
+
+        print(f"NewsAPI quota: {self.remaining_quota(state)} of {self.daily_quota} requests left today")
+        articles = {}
+        for result in results:
+            for article in result:
+                articles.setdefault(article.url, article)
+        return list(articles.values())
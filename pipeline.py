@@ -0,0 +1,242 @@
+from multi_source_fetcher import MultiSourceFetcher
+from ppt_generator import PPTGenerator
+from email_sender import EmailSender
+from seen_store import SeenStore
+from ranker import ArticleRanker
+from editions import load_editions, render_editions
+from html_edition import publish_deck
+from instrumentation import metrics
+from dotenv import find_dotenv, load_dotenv
+from datetime import date
+import os
+import signal
+import time
+
+class NewsletterPipeline:
+    def __init__(self):
+        """Fetch, render and send components kept alive between runs"""
+        self._config_signature = self._config_files_signature()
+        self._build()
+
+    def _build(self):
+        """Create every component from the current configuration, replacing the old ones
+        only once all of them could be created"""
+        seen_store = SeenStore()
+        ppt_gen = None
+        try:
+            fetcher = MultiSourceFetcher(seen_store=seen_store)
+            ppt_gen = PPTGenerator()
+            email_sender = EmailSender()
+            ranker = ArticleRanker()
+        except Exception:
+            self._close(seen_store, ppt_gen)
+            raise
+
+        old_seen_store, old_ppt_gen = getattr(self, 'seen_store', None), getattr(self, 'ppt_gen', None)
+        self.seen_store = seen_store
+        self.fetcher = fetcher
+        self.ppt_gen = ppt_gen
+        self.email_sender = email_sender
+        self.ranker = ranker
+        self._close(old_seen_store, old_ppt_gen)
+
+    @staticmethod
+    def _close(seen_store, ppt_gen):
+        """Release the seen store's database and the render worker processes"""
+        if seen_store is not None:
+            seen_store.close()
+        if ppt_gen is not None:
+            ppt_gen.close()
+
+    def _config_files(self):
+        # Located the same way the modules' own load_dotenv() calls find it
+        return [find_dotenv() or '.env', os.getenv('FEEDS_FILE', 'feeds.json'),
+                os.getenv('EDITIONS_FILE', 'editions.json')]
+
+    def _config_files_signature(self):
+        """Modification times of the files the configuration is read from"""
+        return tuple(os.path.getmtime(path) if os.path.exists(path) else None
+                     for path in self._config_files())
+
+    def reload_if_changed(self, force=False):
+        """Re-read .env and rebuild the components when a configuration file changed"""
+        signature = self._config_files_signature()
+        if not force and signature == self._config_signature:
+            return False
+        print("Configuration changed, reloading...")
+        load_dotenv(override=True)
+        # A failed build leaves the running components in place and is retried next run
+        self._build()
+        self._config_signature = signature
+        return True
+
+    def _sends_html(self):
+        """Whether EMAIL_FORMAT asks for the HTML edition"""
+        return os.getenv('EMAIL_FORMAT', 'pptx').lower() in ('html', 'both')
+
+    def _send(self, deck, articles, recipients=None, seed=None, thumbnails=None):
+        """Email the deck as an attachment, an HTML edition linking to it, or both (EMAIL_FORMAT);
+        seed and thumbnails are those of a streamed deck"""
+        email_format = os.getenv('EMAIL_FORMAT', 'pptx').lower()
+        html = None
+        if self._sends_html():
+            with metrics.stage('html'):
+                html = self.ppt_gen.render_html(articles, deck_url=publish_deck(deck), seed=seed,
+                                                thumbnails=thumbnails)
+        self.email_sender.send_newsletter(None if email_format == 'html' else deck,
+                                          recipients=recipients, html=html)
+
+    def run(self):
+        """Generate and send the tech newsletter to all configured recipients"""
+        try:
+            print("Starting newsletter generation...")
+            self.ppt_gen.reset()
+
+            # The AI image is generated while the news is fetched
+            self.ppt_gen.start_ai_image()
+
+            # Fetch news articles
+            print("Fetching news articles...")
+            with metrics.stage('fetch', memory=True):
+                articles = self.fetcher.fetch_all_news()
+
+            # Only keep articles that earlier runs have not already sent
+            if os.getenv('SKIP_SENT_ARTICLES', 'true').lower() == 'true':
+                articles = self.seen_store.filter_unsent(articles)
+
+            if not articles:
+                print("No articles found. Skipping newsletter generation.")
+                return
+
+            # Put the most relevant recent stories on the slides rather than just the newest
+            if os.getenv('RANKING', 'relevance').lower() == 'relevance':
+                articles = self.ranker.select(articles, PPTGenerator.MAX_NEWS_SLIDES)
+
+            # Generate the PowerPoint presentation in memory
+            with metrics.stage('render', memory=True):
+                deck = self.ppt_gen.render_deck(articles)
+            print(f"PowerPoint presentation generated: {deck.filename} ({deck.size} bytes)")
+
+            # Send newsletter to all configured recipients
+            with deck, metrics.stage('send', memory=True):
+                self._send(deck, articles)
+            self.seen_store.mark_sent(articles[:PPTGenerator.MAX_NEWS_SLIDES])
+            print("Newsletter sent successfully!")
+
+        except Exception as e:
+            print(f"Error generating/sending newsletter: {str(e)}")
+
+    def run_digest(self):
+        """Send a digest deck of up to DIGEST_MAX_ARTICLES stories, rendered in bounded memory"""
+        try:
+            print("Starting digest generation...")
+            self.ppt_gen.reset()
+            self.ppt_gen.start_ai_image()
+
+            print("Fetching news articles...")
+            with metrics.stage('fetch', memory=True):
+                articles = self.fetcher.fetch_all_news()
+
+            # The digest keeps its own record, so it still covers stories the daily decks sent
+            if os.getenv('SKIP_SENT_ARTICLES', 'true').lower() == 'true':
+                articles = self.seen_store.filter_unsent(articles, scope='digest')
+            if not articles:
+                print("No articles found. Skipping digest generation.")
+                return
+
+            max_articles = int(os.getenv('DIGEST_MAX_ARTICLES', 500))
+            if os.getenv('RANKING', 'relevance').lower() == 'relevance':
+                articles = self.ranker.select(articles, max_articles)
+            else:
+                articles = articles[:max_articles]
+
+            # Shared by the deck and the HTML edition, so both get the same quiz and joke
+            seed = f"digest-{date.today().isoformat()}"
+            # The HTML edition's thumbnails are made window by window, while each window's
+            # images are still in memory, rather than by fetching every image again at the end
+            thumbnails = {} if self._sends_html() else None
+            with metrics.stage('render', memory=True, mode='stream'):
+                deck = self.ppt_gen.stream_deck(iter(articles), seed=seed, thumbnails=thumbnails)
+            print(f"PowerPoint presentation generated: {deck.filename} ({deck.size} bytes)")
+
+            with deck, metrics.stage('send', memory=True):
+                self._send(deck, articles, seed=seed, thumbnails=thumbnails)
+            self.seen_store.mark_sent(articles, scope='digest')
+            print("Digest sent successfully!")
+
+        except Exception as e:
+            print(f"Error generating/sending digest: {str(e)}")
+
+    def run_editions(self, editions_file=None):
+        """Fetch once, then render and send every edition to its own recipient group"""
+        try:
+            editions = load_editions(editions_file)
+            if not editions:
+                print("No editions configured. Skipping newsletter generation.")
+                return
+
+            print(f"Starting generation of {len(editions)} editions...")
+            self.ppt_gen.reset()
+            self.ppt_gen.start_ai_image()
+            print("Fetching news articles...")
+            with metrics.stage('fetch', memory=True):
+                articles = self.fetcher.fetch_all_news()
+
+            # Each edition keeps its own record of what it already sent
+            skip_sent = os.getenv('SKIP_SENT_ARTICLES', 'true').lower() == 'true'
+            selections = {}
+            for edition in editions:
+                candidates = self.seen_store.filter_unsent(articles, scope=edition.name) if skip_sent else articles
+                selections[edition.name] = edition.select(candidates)
+
+            # Send each edition as soon as its worker finishes rendering it
+            for edition, deck in render_editions(editions, selections, self.ppt_gen):
+                print(f"Edition '{edition.name}' generated: {deck.filename}")
+                try:
+                    with deck, metrics.stage('send', edition=edition.name):
+                        self._send(deck, selections[edition.name], recipients=edition.recipients or None)
+                    self.seen_store.mark_sent(selections[edition.name][:PPTGenerator.MAX_NEWS_SLIDES],
+                                              scope=edition.name)
+                except Exception as e:
+                    print(f"Error sending edition '{edition.name}': {str(e)}")
+
+        except Exception as e:
+            print(f"Error generating/sending editions: {str(e)}")
+
+def run_daemon(job, times=None, every_minutes=None):
+    """Stay resident and call job(pipeline) on a schedule, reusing one warm pipeline"""
+    import schedule
+
+    pipeline = NewsletterPipeline()
+    reload_requested = []
+    if hasattr(signal, 'SIGHUP'):
+        # kill -HUP forces a configuration reload before the next run
+        signal.signal(signal.SIGHUP, lambda signum, frame: reload_requested.append(True))
+
+    def scheduled_run():
+        # An exception escaping here would stop the daemon, so a bad reload or run is only logged
+        try:
+            pipeline.reload_if_changed(force=bool(reload_requested))
+            reload_requested.clear()
+        except Exception as e:
+            print(f"Error reloading configuration, keeping the previous one: {str(e)}")
+        start = time.monotonic()
+        try:
+            job(pipeline)
+        except Exception as e:
+            print(f"Error during scheduled run: {str(e)}")
+        print(f"Run finished in {time.monotonic() - start:.1f}s, next at {schedule.next_run()}")
+
+    if every_minutes:
+        schedule.every(every_minutes).minutes.do(scheduled_run)
+    for at in times or []:
+        schedule.every().day.at(at).do(scheduled_run)
+    if not schedule.get_jobs():
+        raise ValueError("Daemon mode needs run times or an interval")
+
+    print(f"Daemon started, first run at {schedule.next_run()}")
+    while True:
+        schedule.run_pending()
+        # Wake up at the next run, but at least once a minute so clock changes are noticed
+        idle = schedule.idle_seconds()
+        time.sleep(min(max(idle, 1), 60) if idle is not None else 60)
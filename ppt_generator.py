@@ -1,18 +1,78 @@
-from pptx import Presentation
 from pptx.util import Inches, Pt
 from pptx.dml.color import RGBColor
 from pptx.enum.text import PP_ALIGN
 from pptx.enum.shapes import MSO_SHAPE
-from datetime import datetime
-import requests
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, datetime
+from itertools import islice
+import gc
+import os
 from io import BytesIO
 from content_generator import ContentGenerator
+from image_fetcher import ImagePrefetcher
+from image_cache import ImageCache
+from image_normalizer import ImageNormalizer
+from ai_image_pool import AIImagePool
+from deck_buffer import DeckBuffer
+from html_edition import HTMLNewsletter, inline_image_subtype
+from render_cache import RenderCache
+from slide_templates import TemplateBuilder, SlideTemplate, MediaSpool
+from instrumentation import metrics, rss_bytes
+from cache_paths import newsletter_cache_dir
+
+# Generator that renders slide fragments in this process, created on first use
+_fragment_renderer = None
+
+def _init_fragment_renderer():
+    """Parse the template once per worker process rather than once per batch"""
+    global _fragment_renderer
+    _fragment_renderer = PPTGenerator()
+
+def _render_fragments(articles, images):
+    """Worker process: render the news slides of a batch of articles into fragments"""
+    if _fragment_renderer is None:
+        _init_fragment_renderer()
+    return _fragment_renderer.render_news_fragments(articles, images)
 
 class PPTGenerator:
+    # Picture box sizes in inches, used to size images before embedding
+    NEWS_IMAGE_SIZE = (5.8, 3.8)
+    AI_IMAGE_SIZE = (10, 5)
+    # Size of the article thumbnails in the HTML email
+    THUMBNAIL_SIZE = (1.6, 1.1)
+    # Number of articles that get a slide
+    MAX_NEWS_SLIDES = 15
+    # Bump whenever a layout design below changes so cached templates are rebuilt
+    TEMPLATE_VERSION = 1
+
     def __init__(self):
-        self.prs = Presentation()
-        self.prs.slide_width, self.prs.slide_height = Inches(16), Inches(9)
         self.content_generator = ContentGenerator()
+        image_cache = ImageCache()
+        self.image_fetcher = ImagePrefetcher(cache=image_cache)
+        self.image_normalizer = ImageNormalizer(cache=image_cache)
+        # Today's AI image, reused by reruns and editions on the same day
+        self.ai_image_pool = AIImagePool(self.content_generator, self.image_fetcher, image_cache)
+        # Image bytes downloaded ahead of rendering, keyed by URL
+        self.images = {}
+        # Key of the AI image in self.images (an ai-image:// pool key)
+        self.ai_image_url = None
+        # Image URLs this run already tried, whether or not they could be fetched
+        self.attempted_urls = set()
+        # Set when the images were fetched by another process: prefetch_images then
+        # does no network I/O and missing images fall back to text
+        self.prefetched = False
+        # Finished decks, so a retried run or a duplicate edition is not rendered again
+        self.render_cache = RenderCache()
+        # Streaming decks (stream_deck) fetch and embed images this many articles at a time,
+        # narrowing the window whenever the process grows past the memory ceiling (0 for none)
+        self.stream_window_size = int(os.getenv('STREAM_WINDOW_SIZE', 25))
+        # Their windows are rendered on up to render_workers processes, started on first
+        # use and kept for later decks
+        self.render_workers = int(os.getenv('RENDER_WORKERS', os.cpu_count() or 1))
+        self._render_pool = None
+        self.stream_memory_ceiling = int(os.getenv('STREAM_MEMORY_CEILING_MB', 0)) * 1024 * 1024
         self.colors = {
             'primary': RGBColor(41, 128, 185),    # Blue
             'secondary': RGBColor(46, 204, 113),  # Green
@@ -33,31 +93,98 @@ class PPTGenerator:
             'quiz': 'https://images.unsplash.com/photo-1503676260728-1c00da094a0b?w=800',   # Quiz/education
             'joke': 'https://images.unsplash.com/photo-1485827404703-89b55fcc595e?w=800'    # Innovation/fun
         }
+        # Slides are cloned from the layouts of a master template
+        self.template = SlideTemplate(self._template_path())
+        self.prs = self.template.prs
 
-    def _add_slide_base(self, title_text=None):
-        """Create base slide with clean background"""
-        slide = self.prs.slides.add_slide(self.prs.slide_layouts[5])
-        
-        # Add clean background
-        bg = slide.shapes.add_shape(MSO_SHAPE.RECTANGLE, 0, 0, 
-                                  self.prs.slide_width, self.prs.slide_height)
-        bg.fill.solid()
-        bg.fill.fore_color.rgb = self.colors['light']
-        
-        if title_text:
-            title = slide.shapes.add_textbox(Inches(1), Inches(0.5), Inches(14), Inches(1))
-            tf = title.text_frame
-            tf.text = title_text
-            tf.paragraphs[0].font.size = Pt(32)
-            tf.paragraphs[0].font.color.rgb = self.colors['dark']
-            tf.paragraphs[0].font.bold = True
-        
-        return slide
+    def reset(self):
+        """Prepare for another deck, keeping the parsed template and image caches warm"""
+        self.template.clear()
+        self.images = {}
+        self.ai_image_url = None
+        self.attempted_urls = set()
+        self.prefetched = False
+        self.ai_image_pool.reset()
+
+    def close(self):
+        """Stop the render worker processes"""
+        if self._render_pool is not None:
+            self._render_pool.shutdown()
+            self._render_pool = None
+
+    def _article_image_url(self, article):
+        """Image URL used on an article's slide"""
+        return article.image_url
+
+    def _image_stream(self, image_url):
+        """Return a prefetched image as a stream ready for add_picture"""
+        image_data = self.images.get(image_url)
+        if image_data is None:
+            raise ValueError(f"Image not available: {image_url}")
+        return BytesIO(image_data)
+
+    def prefetch_images(self, articles):
+        """Download every image the deck needs before any slide is rendered"""
+        if self.prefetched:
+            return
+        print("Prefetching images...")
+        # Images an earlier prefetch fetched, or failed to fetch, are not tried again
+        urls = [url for url in map(self._article_image_url, articles)
+                if url and url not in self.images and url not in self.attempted_urls]
+        self.attempted_urls.update(urls)
 
-    def _add_text_box(self, slide, text, left, top, width, height, 
+        # The AI image request runs alongside the article image downloads,
+        # unless start_ai_image already set it going before the news fetch
+        if self.ai_image_url is None:
+            self.start_ai_image()
+        with metrics.stage('image_prefetch'):
+            downloaded = self.image_fetcher.prefetch(urls)
+        with metrics.stage('image_normalize'):
+            self.images.update(self.image_normalizer.normalize_all(downloaded, *self.NEWS_IMAGE_SIZE))
+
+        if self.ai_image_url is None:
+            key, data = self.ai_image_pool.result()
+            if data is not None:
+                self.ai_image_url = key
+                self.images[key] = self.image_normalizer.normalize(data, *self.AI_IMAGE_SIZE)
+
+    def start_ai_image(self):
+        """Start getting today's AI image in the background; a pooled image needs no API call"""
+        return self.ai_image_pool.start()
+
+    def images_for(self, articles):
+        """Prefetched images used by a set of articles, plus the AI image"""
+        urls = [self.ai_image_url] + [self._article_image_url(article) for article in articles]
+        return {url: self.images[url] for url in urls if url in self.images}
+
+    def _template_path(self):
+        """Designed template from PPT_TEMPLATE, or the built-in one cached on disk"""
+        template = os.getenv('PPT_TEMPLATE')
+        if template:
+            return template
+
+        cache_dir = newsletter_cache_dir()
+        path = os.path.join(cache_dir, 'templates', f'newsletter_v{self.TEMPLATE_VERSION}.pptx')
+        if not os.path.exists(path):
+            self._build_template(path)
+        return path
+
+    def _build_template(self, path):
+        """Draw every slide layout once and save them as the master template"""
+        print("Building slide template...")
+        builder = TemplateBuilder(Inches(16), Inches(9), background=str(self.colors['light']))
+        self._design_title_layout(builder)
+        self._design_outline_layout(builder)
+        self._design_ai_image_layout(builder)
+        self._design_news_layouts(builder)
+        self._design_quiz_layout(builder)
+        self._design_joke_layout(builder)
+        builder.save(path)
+
+    def _add_text_box(self, shapes, text, left, top, width, height, 
                      font_size=Pt(20), color='dark', bold=False, alignment=PP_ALIGN.LEFT):
-        """Add formatted text box to slide"""
-        box = slide.shapes.add_textbox(Inches(left), Inches(top), Inches(width), Inches(height))
+        """Add formatted text box to a slide or layout"""
+        box = shapes.add_textbox(Inches(left), Inches(top), Inches(width), Inches(height))
         tf = box.text_frame
         tf.text = text
         p = tf.paragraphs[0]
@@ -67,52 +194,56 @@ class PPTGenerator:
         p.alignment = alignment
         return box
 
-    def _add_title_slide(self):
-        """Add title slide with clean design"""
-        slide = self._add_slide_base()
-        current_date = datetime.now().strftime("%B %d, %Y")
+    def _add_line(self, shapes, left, top, width, height, color='primary'):
+        """Add a thin decorative bar"""
+        line = shapes.add_shape(
+            MSO_SHAPE.RECTANGLE,
+            Inches(left), Inches(top),
+            Inches(width), Inches(height)
+        )
+        line.fill.solid()
+        line.fill.fore_color.rgb = self.colors[color]
+        return line
+
+    def _add_frame(self, shapes, left, top, width, height, fill='light', line='primary', line_width=None):
+        """Add a rounded frame used behind tags, buttons and content areas"""
+        frame = shapes.add_shape(
+            MSO_SHAPE.ROUNDED_RECTANGLE,
+            Inches(left), Inches(top),
+            Inches(width), Inches(height)
+        )
+        frame.fill.solid()
+        frame.fill.fore_color.rgb = self.colors[fill]
+        frame.line.color.rgb = self.colors[line]
+        if line_width is not None:
+            frame.line.width = line_width
+        return frame
+
+    def _design_title_layout(self, builder):
+        """Title slide: headline, divider and a dated subtitle"""
+        shapes = builder.layout('title')
         
         # Add main title with enhanced styling
-        self._add_text_box(slide, "Daily Tech News Update", 2, 3, 12, 2,
+        self._add_text_box(shapes, "Daily Tech News Update", 2, 3, 12, 2,
                           font_size=Pt(56), color='dark', bold=True, alignment=PP_ALIGN.CENTER)
         
         # Add subtitle with decorative line
-        line = slide.shapes.add_shape(
-            MSO_SHAPE.RECTANGLE,
-            Inches(4), Inches(5),
-            Inches(8), Inches(0.05)
-        )
-        line.fill.solid()
-        line.fill.fore_color.rgb = self.colors['primary']
+        self._add_line(shapes, 4, 5, 8, 0.05)
         
-        self._add_text_box(slide, f"Generated on {current_date}\nYour Daily Dose of Tech Innovation",
-                          2, 5.5, 12, 1, font_size=Pt(32), color='dark', alignment=PP_ALIGN.CENTER)
+        subtitle = self._add_text_box(shapes, "Generated on date", 2, 5.5, 12, 1,
+                                      font_size=Pt(32), color='dark', alignment=PP_ALIGN.CENTER)
+        builder.placeholder(subtitle, 'subtitle')
 
-    def _add_outline_slide(self):
-        """Add outline slide showing presentation structure"""
-        slide = self._add_slide_base()
+    def _design_outline_layout(self, builder):
+        """Outline slide showing presentation structure, entirely static"""
+        shapes = builder.layout('outline')
         
         # Add main outline title
-        title_box = slide.shapes.add_textbox(
-            Inches(1), Inches(0.5),
-            Inches(14), Inches(1.2)
-        )
-        tf = title_box.text_frame
-        tf.text = "Today's Tech News Agenda"
-        p = tf.paragraphs[0]
-        p.font.size = Pt(36)
-        p.font.bold = True
-        p.font.color.rgb = self.colors['dark']
-        p.alignment = PP_ALIGN.LEFT
+        self._add_text_box(shapes, "Today's Tech News Agenda", 1, 0.5, 14, 1.2,
+                          font_size=Pt(36), color='dark', bold=True)
 
         # Add decorative line under title
-        line = slide.shapes.add_shape(
-            MSO_SHAPE.RECTANGLE,
-            Inches(1), Inches(1.8),
-            Inches(14), Inches(0.03)
-        )
-        line.fill.solid()
-        line.fill.fore_color.rgb = self.colors['primary']
+        self._add_line(shapes, 1, 1.8, 14, 0.03)
         
         # Add outline items with icons and frames
         outline_items = [
@@ -124,120 +255,36 @@ class PPTGenerator:
         
         # Add each outline item with modern styling
         for i, (title, desc) in enumerate(outline_items):
-            # Add item frame
-            item_frame = slide.shapes.add_shape(
-                MSO_SHAPE.ROUNDED_RECTANGLE,
-                Inches(1), Inches(2.5 + i*1.5),
-                Inches(14), Inches(1.2)
-            )
-            item_frame.fill.solid()
-            item_frame.fill.fore_color.rgb = self.colors['light']
-            item_frame.line.color.rgb = self.colors['primary']
-            item_frame.line.width = Pt(1)
-            
-            # Add item title
-            title_box = slide.shapes.add_textbox(
-                Inches(1.5), Inches(2.7 + i*1.5),
-                Inches(13), Inches(0.4)
-            )
-            tf = title_box.text_frame
-            tf.text = title
-            p = tf.paragraphs[0]
-            p.font.size = Pt(24)
-            p.font.bold = True
-            p.font.color.rgb = self.colors['dark']
-            p.alignment = PP_ALIGN.LEFT
-            
-            # Add item description
-            desc_box = slide.shapes.add_textbox(
-                Inches(2), Inches(3.1 + i*1.5),
-                Inches(12), Inches(0.4)
-            )
-            tf = desc_box.text_frame
-            tf.text = desc
-            p = tf.paragraphs[0]
-            p.font.size = Pt(16)
-            p.font.color.rgb = self.colors['primary']
-            p.alignment = PP_ALIGN.LEFT
+            self._add_frame(shapes, 1, 2.5 + i*1.5, 14, 1.2, line_width=Pt(1))
+            self._add_text_box(shapes, title, 1.5, 2.7 + i*1.5, 13, 0.4,
+                              font_size=Pt(24), color='dark', bold=True)
+            self._add_text_box(shapes, desc, 2, 3.1 + i*1.5, 12, 0.4,
+                              font_size=Pt(16), color='primary')
 
-    def _add_ai_image_slide(self):
-        """Add AI-generated image slide with stylish centered title"""
-        slide = self._add_slide_base()
-        
-        # Add decorative line above title
-        line_top = slide.shapes.add_shape(
-            MSO_SHAPE.RECTANGLE,
-            Inches(6), Inches(0.8),
-            Inches(4), Inches(0.05)
-        )
-        line_top.fill.solid()
-        line_top.fill.fore_color.rgb = self.colors['primary']
-        
-        # Add main title with special formatting
-        title_box = slide.shapes.add_textbox(
-            Inches(2), Inches(1),
-            Inches(12), Inches(1)
-        )
-        tf = title_box.text_frame
-        tf.text = "TECH INNOVATION"
-        p = tf.paragraphs[0]
-        p.font.size = Pt(50)
-        p.font.bold = True
-        p.font.color.rgb = self.colors['dark']
-        p.alignment = PP_ALIGN.CENTER
-        
-        # Add "OF THE DAY" subtitle
-        subtitle_box = slide.shapes.add_textbox(
-            Inches(2), Inches(1.8),
-            Inches(12), Inches(0.6)
-        )
-        tf = subtitle_box.text_frame
-        tf.text = "OF THE DAY"
-        p = tf.paragraphs[0]
-        p.font.size = Pt(30)
-        p.font.color.rgb = self.colors['primary']
-        p.alignment = PP_ALIGN.CENTER
+    def _design_ai_image_layout(self, builder):
+        """AI image slide with stylish centered title and an image area"""
+        shapes = builder.layout('ai_image')
         
-        # Add decorative line below title
-        line_bottom = slide.shapes.add_shape(
-            MSO_SHAPE.RECTANGLE,
-            Inches(6), Inches(2.5),
-            Inches(4), Inches(0.05)
-        )
-        line_bottom.fill.solid()
-        line_bottom.fill.fore_color.rgb = self.colors['primary']
+        # Add decorative lines around the title
+        self._add_line(shapes, 6, 0.8, 4, 0.05)
+        self._add_text_box(shapes, "TECH INNOVATION", 2, 1, 12, 1,
+                          font_size=Pt(50), color='dark', bold=True, alignment=PP_ALIGN.CENTER)
+        self._add_text_box(shapes, "OF THE DAY", 2, 1.8, 12, 0.6,
+                          font_size=Pt(30), color='primary', alignment=PP_ALIGN.CENTER)
+        self._add_line(shapes, 6, 2.5, 4, 0.05)
         
-        # Generate and add AI image
-        image_url = self.content_generator.generate_tech_image()
-        if image_url:
-            try:
-                response = requests.get(image_url)
-                img_stream = BytesIO(response.content)
-                
-                # Add image with proper positioning
-                slide.shapes.add_picture(
-                    img_stream, 
-                    Inches(3), Inches(3),
-                    width=Inches(10),
-                    height=Inches(5)
-                )
-            except Exception as e:
-                print(f"Error adding AI image: {str(e)}")
-                # Add descriptive text instead of image
-                desc_box = slide.shapes.add_textbox(
-                    Inches(3), Inches(3),
-                    Inches(10), Inches(5)
-                )
-                tf = desc_box.text_frame
-                tf.text = "Today's innovation focuses on emerging technologies in AI, machine learning, and sustainable tech solutions that are shaping our digital future."
-                p = tf.paragraphs[0]
-                p.font.size = Pt(28)
-                p.font.color.rgb = self.colors['dark']
-                p.alignment = PP_ALIGN.CENTER
+        # The image and its text fallback share one area; only one is filled
+        width, height = self.AI_IMAGE_SIZE
+        image = shapes.add_textbox(Inches(3), Inches(3), Inches(width), Inches(height))
+        image.text_frame.text = "AI image"
+        builder.placeholder(image, 'image', picture=True)
+        fallback = self._add_text_box(shapes, "Innovation summary", 3, 3, width, height,
+                                      font_size=Pt(28), color='dark', alignment=PP_ALIGN.CENTER)
+        builder.placeholder(fallback, 'fallback')
                 
         # Add decorative elements
         for i, color in enumerate(['primary', 'accent', 'secondary']):
-            circle = slide.shapes.add_shape(
+            circle = shapes.add_shape(
                 MSO_SHAPE.OVAL,
                 Inches(1 + i*0.3), Inches(1 + i*0.3),
                 Inches(0.5), Inches(0.5)
@@ -246,272 +293,378 @@ class PPTGenerator:
             circle.fill.fore_color.rgb = self.colors[color]
             circle.line.color.rgb = self.colors['light']
 
-    def _add_news_slide(self, article):
-        """Add news slide with modern layout and image"""
-        slide = self._add_slide_base()
-        
-        # Add title with modern styling
-        title_box = slide.shapes.add_textbox(
-            Inches(1), Inches(0.5),
-            Inches(14), Inches(1.2)
-        )
-        tf = title_box.text_frame
-        tf.text = str(article.get('title', 'No Title Available'))
-        p = tf.paragraphs[0]
-        p.font.size = Pt(36)
-        p.font.bold = True
-        p.font.color.rgb = self.colors['dark']
-        p.alignment = PP_ALIGN.LEFT
+    def _design_news_common(self, builder, shapes):
+        """Title, source tag, read-more button and separator shared by news layouts"""
+        title = self._add_text_box(shapes, "Article title", 1, 0.5, 14, 1.2,
+                                   font_size=Pt(36), color='dark', bold=True)
+        builder.placeholder(title, 'title')
 
         # Add source tag in a modern pill shape
-        source_frame = slide.shapes.add_shape(
-            MSO_SHAPE.ROUNDED_RECTANGLE,
-            Inches(1), Inches(2),
-            Inches(2.5), Inches(0.4)
-        )
-        source_frame.fill.solid()
-        source_frame.fill.fore_color.rgb = self.colors['primary']
-        source_frame.line.color.rgb = self.colors['primary']
-        
-        source_box = slide.shapes.add_textbox(
-            Inches(1.2), Inches(2.05),
-            Inches(2), Inches(0.3)
-        )
-        tf = source_box.text_frame
-        tf.text = str(article.get('source', 'Unknown'))
-        p = tf.paragraphs[0]
-        p.font.size = Pt(12)
-        p.font.color.rgb = self.colors['light']
-        p.alignment = PP_ALIGN.CENTER
+        self._add_frame(shapes, 1, 2, 2.5, 0.4, fill='primary')
+        source = self._add_text_box(shapes, "Source", 1.2, 2.05, 2, 0.3,
+                                    font_size=Pt(12), color='light', alignment=PP_ALIGN.CENTER)
+        builder.placeholder(source, 'source')
 
         # Add "Read Full Article" button
-        read_more_frame = slide.shapes.add_shape(
-            MSO_SHAPE.ROUNDED_RECTANGLE,
-            Inches(12), Inches(2),
-            Inches(3), Inches(0.4)
-        )
-        read_more_frame.fill.solid()
-        read_more_frame.fill.fore_color.rgb = self.colors['secondary']
-        read_more_frame.line.color.rgb = self.colors['secondary']
-        
-        read_more_box = slide.shapes.add_textbox(
-            Inches(12.2), Inches(2.05),
-            Inches(2.6), Inches(0.3)
-        )
-        tf = read_more_box.text_frame
-        tf.text = "Read Full Article →"
-        p = tf.paragraphs[0]
-        p.font.size = Pt(12)
-        p.font.color.rgb = self.colors['light']
-        p.alignment = PP_ALIGN.CENTER
+        self._add_frame(shapes, 12, 2, 3, 0.4, fill='secondary', line='secondary')
+        self._add_text_box(shapes, "Read Full Article →", 12.2, 2.05, 2.6, 0.3,
+                          font_size=Pt(12), color='light', alignment=PP_ALIGN.CENTER)
+
+        # Add bottom line separator
+        self._add_line(shapes, 1, 7.5, 14, 0.03)
+
+    def _design_news_layouts(self, builder):
+        """News slides: two-column with an image, or full-width text only"""
+        shapes = builder.layout('news_image')
+        self._design_news_common(builder, shapes)
+        description = self._add_text_box(shapes, "Article description", 1, 3, 7, 4,
+                                         font_size=Pt(24), color='dark')
+        builder.placeholder(description, 'description')
+
+        # Add image frame and image area
+        self._add_frame(shapes, 9, 3, 6, 4, line_width=Pt(2))
+        width, height = self.NEWS_IMAGE_SIZE
+        image = shapes.add_textbox(Inches(9.1), Inches(3.1), Inches(width), Inches(height))
+        image.text_frame.text = "Article image"
+        builder.placeholder(image, 'image', picture=True)
+
+        shapes = builder.layout('news_text')
+        self._design_news_common(builder, shapes)
+        description = self._add_text_box(shapes, "Article description", 1, 3, 14, 4,
+                                         font_size=Pt(24), color='dark')
+        builder.placeholder(description, 'description')
 
-        # Try to add image and content in two columns, fallback to full-width content if image fails
+    def _quiz_option_box(self, index):
+        """Position and size in inches of a quiz option's frame"""
+        row = index // 2
+        col = index % 2
+        return 1 + col*7.5, 5 + row*1.2, 6.5, 1
+
+    def _design_quiz_layout(self, builder):
+        """Quiz slide with a question and a grid of four options"""
+        shapes = builder.layout('quiz')
+        title = self._add_text_box(shapes, "Tech Quiz Challenge", 1, 0.5, 14, 1.2,
+                                   font_size=Pt(36), color='dark', bold=True)
+        builder.placeholder(title, 'title')
+
+        # Add quiz tag
+        self._add_frame(shapes, 1, 2, 2, 0.4, fill='primary')
+        self._add_text_box(shapes, "Question", 1.2, 2.05, 1.6, 0.3,
+                          font_size=Pt(12), color='light', alignment=PP_ALIGN.CENTER)
+
+        # Add main content area with question
+        self._add_frame(shapes, 1, 3, 14, 1.5, line_width=Pt(2))
+        question = self._add_text_box(shapes, "Question", 1.5, 3.3, 13, 1,
+                                      font_size=Pt(24), color='dark', bold=True)
+        builder.placeholder(question, 'question')
+
+        # Add options in a grid layout
+        for j in range(4):
+            left, top, width, height = self._quiz_option_box(j)
+            self._add_frame(shapes, left, top, width, height, line_width=Pt(1))
+            option = self._add_text_box(shapes, f"Option {chr(65+j)}", left + 0.5, top + 0.2, 5.5, 0.6,
+                                        font_size=Pt(20), color='dark')
+            builder.placeholder(option, f'option_{j}')
+
+        # Add bottom line separator
+        self._add_line(shapes, 1, 7.5, 14, 0.03)
+
+    def _design_joke_layout(self, builder):
+        """Joke slide with a fixed heading"""
+        shapes = builder.layout('joke')
+        self._add_text_box(shapes, "Tech Humor Break", 1, 0.5, 14, 1,
+                          font_size=Pt(32), color='primary', bold=True)
+        joke = self._add_text_box(shapes, "Joke", 1, 3, 14, 2,
+                                  font_size=Pt(24), color='dark', alignment=PP_ALIGN.CENTER)
+        builder.placeholder(joke, 'joke')
+
+    def _add_title_slide(self):
+        """Add title slide with clean design"""
+        current_date = datetime.now().strftime("%B %d, %Y")
+        self.template.add_slide('title', text={
+            'subtitle': f"Generated on {current_date}\nYour Daily Dose of Tech Innovation"
+        })
+
+    def _add_outline_slide(self):
+        """Add outline slide showing presentation structure"""
+        self.template.add_slide('outline')
+
+    def _add_ai_image_slide(self):
+        """Add AI-generated image slide with stylish centered title"""
+        # Add the AI image generated during the prefetch stage
+        image_url = self.ai_image_url
+        if image_url:
+            try:
+                self.template.add_slide('ai_image', pictures={'image': self._image_stream(image_url)})
+                return
+            except Exception as e:
+                print(f"Error adding AI image: {str(e)}")
+
+        # Add descriptive text instead of image
+        self.template.add_slide('ai_image', text={
+            'fallback': "Today's innovation focuses on emerging technologies in AI, machine learning, "
+                        "and sustainable tech solutions that are shaping our digital future."
+        })
+
+    def _add_news_slide(self, article):
+        """Add news slide with modern layout and image"""
+        text = {
+            'title': article.title or 'No Title Available',
+            'source': article.source or 'Unknown',
+            'description': article.description or 'No description available'
+        }
+
+        # Use the two-column layout when the image is available, full width otherwise
         try:
-            image_url = article.get('urlToImage', self.content_images['tech'])
-            response = requests.get(image_url)
-            img_stream = BytesIO(response.content)
-            
-            # If image loads successfully, use two-column layout
-            left_content = slide.shapes.add_textbox(
-                Inches(1), Inches(3),
-                Inches(7), Inches(4)
-            )
-            tf = left_content.text_frame
-            tf.text = str(article.get('description', 'No description available'))
-            p = tf.paragraphs[0]
-            p.font.size = Pt(24)
-            p.font.color.rgb = self.colors['dark']
-            p.alignment = PP_ALIGN.LEFT
-            
-            # Add image frame and image
-            image_frame = slide.shapes.add_shape(
-                MSO_SHAPE.ROUNDED_RECTANGLE,
-                Inches(9), Inches(3),
-                Inches(6), Inches(4)
-            )
-            image_frame.fill.solid()
-            image_frame.fill.fore_color.rgb = self.colors['light']
-            image_frame.line.color.rgb = self.colors['primary']
-            image_frame.line.width = Pt(2)
-            
-            image = slide.shapes.add_picture(
-                img_stream,
-                Inches(9.1), Inches(3.1),
-                width=Inches(5.8),
-                height=Inches(3.8)
-            )
+            img_stream = self._image_stream(self._article_image_url(article))
         except Exception as e:
             print(f"Error adding article image: {str(e)}")
-            # If image fails, use full-width content layout
-            content = slide.shapes.add_textbox(
-                Inches(1), Inches(3),
-                Inches(14), Inches(4)
-            )
-            tf = content.text_frame
-            tf.text = str(article.get('description', 'No description available'))
-            p = tf.paragraphs[0]
-            p.font.size = Pt(24)
-            p.font.color.rgb = self.colors['dark']
-            p.alignment = PP_ALIGN.LEFT
+            self.template.add_slide('news_text', text=text)
+            return
+        self.template.add_slide('news_image', text=text, pictures={'image': img_stream})
 
-        # Add bottom line separator
-        bottom_line = slide.shapes.add_shape(
-            MSO_SHAPE.RECTANGLE,
-            Inches(1), Inches(7.5),
-            Inches(14), Inches(0.03)
-        )
-        bottom_line.fill.solid()
-        bottom_line.fill.fore_color.rgb = self.colors['primary']
-
-    def _add_quiz_slides(self):
+    def _add_quiz_slides(self, quizzes):
         """Add quiz slides with clean layout focused on content"""
-        for i, quiz in enumerate(self.content_generator.generate_tech_quiz(2), 1):
-            slide = self._add_slide_base()
-            
-            # Add title with modern styling
-            title_box = slide.shapes.add_textbox(
-                Inches(1), Inches(0.5),
-                Inches(14), Inches(1.2)
-            )
-            tf = title_box.text_frame
-            tf.text = f"Tech Quiz Challenge #{i}"
-            p = tf.paragraphs[0]
-            p.font.size = Pt(36)
-            p.font.bold = True
-            p.font.color.rgb = self.colors['dark']
-            p.alignment = PP_ALIGN.LEFT
-
-            # Add quiz tag
-            quiz_frame = slide.shapes.add_shape(
-                MSO_SHAPE.ROUNDED_RECTANGLE,
-                Inches(1), Inches(2),
-                Inches(2), Inches(0.4)
-            )
-            quiz_frame.fill.solid()
-            quiz_frame.fill.fore_color.rgb = self.colors['primary']
-            quiz_frame.line.color.rgb = self.colors['primary']
-            
-            quiz_box = slide.shapes.add_textbox(
-                Inches(1.2), Inches(2.05),
-                Inches(1.6), Inches(0.3)
-            )
-            tf = quiz_box.text_frame
-            tf.text = "Question"
-            p = tf.paragraphs[0]
-            p.font.size = Pt(12)
-            p.font.color.rgb = self.colors['light']
-            p.alignment = PP_ALIGN.CENTER
-
-            # Add main content area with question
-            question_frame = slide.shapes.add_shape(
-                MSO_SHAPE.ROUNDED_RECTANGLE,
-                Inches(1), Inches(3),
-                Inches(14), Inches(1.5)
-            )
-            question_frame.fill.solid()
-            question_frame.fill.fore_color.rgb = self.colors['light']
-            question_frame.line.color.rgb = self.colors['primary']
-            question_frame.line.width = Pt(2)
-            
-            question_box = slide.shapes.add_textbox(
-                Inches(1.5), Inches(3.3),
-                Inches(13), Inches(1)
-            )
-            tf = question_box.text_frame
-            tf.text = quiz['question']
-            p = tf.paragraphs[0]
-            p.font.size = Pt(24)
-            p.font.bold = True
-            p.font.color.rgb = self.colors['dark']
-            p.alignment = PP_ALIGN.LEFT
-
-            # Add options in a grid layout
-            for j, option in enumerate(quiz['options']):
-                row = j // 2
-                col = j % 2
-                
-                option_frame = slide.shapes.add_shape(
+        for i, quiz in enumerate(quizzes, 1):
+            options = quiz['options'][:4]
+            text = {'title': f"Tech Quiz Challenge #{i}", 'question': quiz['question']}
+            for j, option in enumerate(options):
+                text[f'option_{j}'] = f"{chr(65+j)}. {option}"
+            slide = self.template.add_slide('quiz', text=text)
+
+            # Highlight the correct answer on top of the layout's option frame
+            if quiz['correct'] in options:
+                j = options.index(quiz['correct'])
+                left, top, width, height = self._quiz_option_box(j)
+                highlight = slide.shapes.add_shape(
                     MSO_SHAPE.ROUNDED_RECTANGLE,
-                    Inches(1 + col*7.5), Inches(5 + row*1.2),
-                    Inches(6.5), Inches(1)
-                )
-                option_frame.fill.solid()
-                option_frame.fill.fore_color.rgb = self.colors['light']
-                if option == quiz['correct']:
-                    option_frame.line.color.rgb = self.colors['secondary']
-                    option_frame.line.width = Pt(2)
-                else:
-                    option_frame.line.color.rgb = self.colors['primary']
-                    option_frame.line.width = Pt(1)
-                
-                option_box = slide.shapes.add_textbox(
-                    Inches(1.5 + col*7.5), Inches(5.2 + row*1.2),
-                    Inches(5.5), Inches(0.6)
+                    Inches(left), Inches(top),
+                    Inches(width), Inches(height)
                 )
-                tf = option_box.text_frame
-                tf.text = f"{chr(65+j)}. {option}"
-                p = tf.paragraphs[0]
-                p.font.size = Pt(20)
-                if option == quiz['correct']:
-                    p.font.color.rgb = self.colors['secondary']
-                    p.font.bold = True
-                else:
-                    p.font.color.rgb = self.colors['dark']
-                p.alignment = PP_ALIGN.LEFT
-
-            # Add bottom line separator
-            bottom_line = slide.shapes.add_shape(
-                MSO_SHAPE.RECTANGLE,
-                Inches(1), Inches(7.5),
-                Inches(14), Inches(0.03)
-            )
-            bottom_line.fill.solid()
-            bottom_line.fill.fore_color.rgb = self.colors['primary']
+                highlight.fill.background()
+                highlight.line.color.rgb = self.colors['secondary']
+                highlight.line.width = Pt(2)
+
+                option_box = self.template.field(slide, 'quiz', f'option_{j}')
+                for run in option_box.text_frame.paragraphs[0].runs:
+                    run.font.color.rgb = self.colors['secondary']
+                    run.font.bold = True
 
-    def _add_joke_slide(self):
+    def _add_joke_slide(self, joke):
         """Add joke slide with improved layout"""
-        slide = self._add_slide_base()
-        
-        # Add title
-        title_box = slide.shapes.add_textbox(
-            Inches(1), Inches(0.5),
-            Inches(14), Inches(1)
-        )
-        tf = title_box.text_frame
-        tf.text = "Tech Humor Break"
-        p = tf.paragraphs[0]
-        p.font.size = Pt(32)
-        p.font.bold = True
-        p.font.color.rgb = self.colors['primary']
-        p.alignment = PP_ALIGN.LEFT
-        
-        # Add joke with proper spacing
-        joke = self.content_generator.get_tech_joke()
-        joke_box = slide.shapes.add_textbox(
-            Inches(1), Inches(3),
-            Inches(14), Inches(2)
-        )
-        tf = joke_box.text_frame
-        tf.text = joke
-        p = tf.paragraphs[0]
-        p.font.size = Pt(24)
-        p.font.color.rgb = self.colors['dark']
-        p.alignment = PP_ALIGN.CENTER
+        self.template.add_slide('joke', text={'joke': joke})
 
-    def generate_presentation(self, articles):
-        """Generate complete presentation"""
-        print("Generating presentation...")
-        self._add_title_slide()
-        self._add_outline_slide()  # Add outline slide after title
-        self._add_ai_image_slide()
-        self._add_quiz_slides()
-        
-        for article in articles[:15]:
+    def _template_signature(self):
+        """Identifies the layouts a deck is rendered with"""
+        path = self._template_path()
+        return [self.TEMPLATE_VERSION, path, os.path.getmtime(path) if os.path.exists(path) else None]
+
+    def _deck_inputs(self, articles, day=None):
+        """Everything a deck is rendered from, and its fingerprint"""
+        day = day or date.today()
+        inputs = {
+            'template': self._template_signature(),
+            'day': day.isoformat(),
+            'articles': [[article.title, article.source, article.description, article.image_url]
+                         for article in articles[:self.MAX_NEWS_SLIDES]],
+            # The pool key pins the day's image, so it is known before the image is
+            'ai_image': self.ai_image_url or self.ai_image_pool.key(day)
+        }
+        # Quiz and joke are picked from the other inputs, so a rerun gets the same ones
+        seed = RenderCache.fingerprint(inputs)
+        inputs['quiz'] = self.content_generator.generate_tech_quiz(2, seed=seed)
+        inputs['joke'] = self.content_generator.get_tech_joke(seed=seed)
+        return inputs, RenderCache.fingerprint(inputs)
+
+    def deck_fingerprint(self, articles):
+        """Fingerprint under which the deck for articles is cached"""
+        return self._deck_inputs(articles)[1]
+
+    def _render(self, articles, inputs):
+        """Add every slide of the deck to the template"""
+        articles = articles[:self.MAX_NEWS_SLIDES]
+        self.prefetch_images(articles)
+
+        with metrics.stage('slide', kind='title'):
+            self._add_title_slide()
+        with metrics.stage('slide', kind='outline'):
+            self._add_outline_slide()  # Add outline slide after title
+        with metrics.stage('slide', kind='ai_image'):
+            self._add_ai_image_slide()
+        with metrics.stage('slide', kind='quiz'):
+            self._add_quiz_slides(inputs['quiz'])
+
+        for article in articles:
+            with metrics.stage('slide', kind='news'):
+                self._add_news_slide(article)
+
+        with metrics.stage('slide', kind='joke'):
+            self._add_joke_slide(inputs['joke'])
+
+    def render_news_fragments(self, articles, images):
+        """News slides for articles, exported as fragments for another deck to import"""
+        self.template.clear()
+        self.images = images
+        for article in articles:
             self._add_news_slide(article)
-            
-        self._add_joke_slide()
-        
-        # Save the presentation
-        pptx_file = f"tech_news_{datetime.now().strftime('%Y%m%d')}.pptx"
-        self.prs.save(pptx_file)
-        return pptx_file 
\ No newline at end of file
+        return self.template.export_slides()
+
+    def _submit_news_window(self, articles, thumbnails=None):
+        """Fetch and normalize one window's images and start rendering its news slides,
+        returning a future of the fragments; thumbnails, if a dict, gets the window's thumbnails"""
+        urls = [url for url in map(self._article_image_url, articles) if url]
+        with metrics.stage('image_prefetch'):
+            downloaded = self.image_fetcher.prefetch(urls)
+        with metrics.stage('image_normalize'):
+            images = self.image_normalizer.normalize_all(downloaded, *self.NEWS_IMAGE_SIZE)
+            if thumbnails is not None:
+                # Only these small copies outlive the window, not the originals
+                thumbnails.update(self._thumbnails(downloaded))
+        if self.render_workers <= 1:
+            future = Future()
+            future.set_result(_render_fragments(articles, images))
+            return future
+        if self._render_pool is None:
+            self._render_pool = ProcessPoolExecutor(max_workers=self.render_workers,
+                                                    initializer=_init_fragment_renderer)
+        return self._render_pool.submit(_render_fragments, articles, images)
+
+    def stream_deck(self, articles, filename=None, window_size=None, memory_ceiling=None, seed=None,
+                    thumbnails=None):
+        """Render a deck with a slide for every article of an iterable, one window of images at a time;
+        render_html with the same seed, and the thumbnails dict filled in here, gives the matching
+        HTML edition"""
+        window_size = window_size or self.stream_window_size
+        memory_ceiling = self.stream_memory_ceiling if memory_ceiling is None else memory_ceiling
+        filename = filename or self.deck_filename()
+        print("Generating presentation in streaming mode...")
+
+        # Without every article up front there is no fingerprint, so quiz and joke follow the seed
+        seed = seed or date.today().isoformat()
+        self.prefetch_images([])
+        with metrics.stage('slide', kind='title'):
+            self._add_title_slide()
+        with metrics.stage('slide', kind='outline'):
+            self._add_outline_slide()
+        with metrics.stage('slide', kind='ai_image'):
+            self._add_ai_image_slide()
+        with metrics.stage('slide', kind='quiz'):
+            self._add_quiz_slides(self.content_generator.generate_tech_quiz(2, seed=seed))
+        self.images = {}
+
+        articles = iter(articles)
+        count = 0
+        peak = rss_bytes()
+        # Windows being rendered, oldest first; one per worker while the next one's images are fetched
+        pending = deque()
+        exhausted = False
+        with MediaSpool() as spool:
+            while pending or not exhausted:
+                if not exhausted:
+                    window = list(islice(articles, window_size))
+                    if window:
+                        pending.append((len(window), self._submit_news_window(window, thumbnails)))
+                    else:
+                        exhausted = True
+                if not pending or (not exhausted and len(pending) < self.render_workers):
+                    continue
+
+                size, future = pending.popleft()
+                with metrics.stage('slide', kind='news_window', memory=True):
+                    try:
+                        fragments, media = future.result()
+                    except BrokenProcessPool:
+                        # A dead worker breaks the pool; the next deck starts a fresh one
+                        self._render_pool = None
+                        raise
+                    # The window's images go straight to the spool; the deck only reads them back when saved
+                    self.template.import_slides(fragments, media, spool)
+                del fragments, media
+                count += size
+
+                # Freed memory is rarely returned to the OS, so only a new high above the
+                # ceiling counts; a process holding steady just above it carries on
+                rss = rss_bytes()
+                rising = rss > peak
+                peak = max(peak, rss)
+                if memory_ceiling and rss > memory_ceiling and rising:
+                    gc.collect()
+                    if window_size == 1:
+                        raise MemoryError(f"Deck generation kept growing past the memory ceiling "
+                                          f"({rss // 2**20} MB of {memory_ceiling // 2**20} MB) "
+                                          f"after {count} articles")
+                    window_size = max(window_size // 2, 1)
+                    print(f"Memory at {rss // 2**20} MB and growing, above the ceiling; "
+                          f"continuing {window_size} articles at a time")
+
+            with metrics.stage('slide', kind='joke'):
+                self._add_joke_slide(self.content_generator.get_tech_joke(seed=seed))
+            deck = DeckBuffer(filename)
+            with metrics.stage('save', memory=True):
+                self.template.save(deck.file)
+            metrics.add_bytes('save', deck.size)
+            peak = max(peak, rss_bytes())
+
+        print(f"Streamed {count} news slides, peak memory {peak / 2**20:.1f} MB")
+        return deck
+
+    def _thumbnail_max_size(self):
+        """Pixel size of the thumbnail box at the normalizer's DPI"""
+        return tuple(int(inches * self.image_normalizer.dpi) for inches in self.THUMBNAIL_SIZE)
+
+    def _thumbnails(self, sources):
+        """HTML edition thumbnails of url -> bytes images, without those the normalizer could not
+        shrink into the thumbnail box"""
+        thumbnails = self.image_normalizer.normalize_all(sources, *self.THUMBNAIL_SIZE)
+        max_size = self._thumbnail_max_size()
+        return {url: data for url, data in thumbnails.items() if inline_image_subtype(data, max_size)}
+
+    def render_html(self, articles, deck_url=None, seed=None, thumbnails=None):
+        """HTML email rendition of the deck for articles, with the same quiz and joke;
+        pass the seed and thumbnails of a stream_deck deck to match it instead of a render_deck one"""
+        if seed is None:
+            inputs, _ = self._deck_inputs(articles)
+            articles = articles[:self.MAX_NEWS_SLIDES]
+            quiz, joke = inputs['quiz'], inputs['joke']
+        else:
+            quiz = self.content_generator.generate_tech_quiz(2, seed=seed)
+            joke = self.content_generator.get_tech_joke(seed=seed)
+        if thumbnails is None:
+            urls = [url for url in map(self._article_image_url, articles) if url]
+            # After a render cache hit nothing was prefetched; the image cache still has the originals
+            sources = {url: self.images[url] for url in urls if url in self.images}
+            sources.update(self.image_fetcher.prefetch([url for url in urls if url not in sources]))
+            thumbnails = self._thumbnails(sources)
+        title = f"Daily Tech Newsletter - {datetime.now().strftime('%B %d, %Y')}"
+        return HTMLNewsletter(title, articles, quiz, joke, thumbnails, deck_url,
+                              max_thumbnail_size=self._thumbnail_max_size())
+
+    def deck_filename(self):
+        """Name the deck is saved or attached under"""
+        return f"tech_news_{datetime.now().strftime('%Y%m%d')}.pptx"
+
+    def render_deck(self, articles, filename=None):
+        """Generate the presentation into an in-memory DeckBuffer instead of a file"""
+        inputs, fingerprint = self._deck_inputs(articles)
+        filename = filename or self.deck_filename()
+        data = self.render_cache.get(fingerprint)
+        if data is not None:
+            print("Reusing the deck rendered earlier from the same inputs")
+            return DeckBuffer(filename, data)
+
+        print("Generating presentation...")
+        self._render(articles, inputs)
+        deck = DeckBuffer(filename)
+        with metrics.stage('save'):
+            self.template.save(deck.file)
+        metrics.add_bytes('save', deck.size)
+        # Without its AI image the deck is incomplete, so a rerun should try again
+        if self.ai_image_url in self.images:
+            self.render_cache.put(fingerprint, deck)
+        return deck
+
+    def generate_presentation(self, articles, pptx_file=None):
+        """Generate complete presentation"""
+        pptx_file = pptx_file or self.deck_filename()
+        with self.render_deck(articles, os.path.basename(pptx_file)) as deck:
+            return deck.save(pptx_file)
@@ -0,0 +1,139 @@
+import numpy as np
+import os
+import re
+import time
+
+DEFAULT_KEYWORDS = {
+    'artificial intelligence': 2.0, 'ai': 2.0, 'machine learning': 2.0, 'llm': 1.5,
+    'openai': 1.5, 'cybersecurity': 1.5, 'security': 1.2, 'ransomware': 1.2, 'vulnerability': 1.2,
+    'cloud': 1.0, 'programming': 1.0, 'software': 1.0, 'developer': 1.0, 'open source': 1.0,
+    'chip': 1.0, 'semiconductor': 1.0, 'robotics': 1.0, 'quantum': 1.0, 'startup': 0.8,
+    'technology': 0.5, 'tech': 0.5
+}
+
+def parse_keywords(configured):
+    """Parse "term:weight,term" into {term: weight}"""
+    keywords = {}
+    for item in configured.split(','):
+        term, _, weight = item.strip().partition(':')
+        if term.strip():
+            keywords[term.strip().lower()] = float(weight) if weight else 1.0
+    return keywords
+
+class ArticleRanker:
+    def __init__(self, keywords=None, half_life_hours=None, relevance_weight=None, max_per_source=None):
+        """Score articles by keyword TF-IDF and recency, and pick a diverse top k"""
+        if keywords is None:
+            configured = os.getenv('RANKING_KEYWORDS', '')
+            keywords = parse_keywords(configured) if configured else DEFAULT_KEYWORDS
+        elif not isinstance(keywords, dict):
+            keywords = {keyword.strip().lower(): 1.0 for keyword in keywords if keyword.strip()}
+        self.terms = list(keywords)
+        self.weights = np.array([keywords[term] for term in self.terms], dtype=np.float64)
+        # Hours after which an article's recency score has halved
+        self.half_life_hours = half_life_hours or float(os.getenv('RANKING_HALF_LIFE_HOURS', 24))
+        # Share of the score that comes from relevance, the rest from recency
+        self.relevance_weight = (relevance_weight if relevance_weight is not None
+                                 else float(os.getenv('RANKING_RELEVANCE_WEIGHT', 0.7)))
+        self.max_per_source = max_per_source or int(os.getenv('RANKING_MAX_PER_SOURCE', 3))
+
+        # One pass of one regex finds every keyword, longest phrases first
+        self._index = {term: i for i, term in enumerate(self.terms)}
+        pattern = '|'.join(re.escape(term) for term in sorted(self.terms, key=len, reverse=True))
+        self._pattern = re.compile(rf'\b(?:{pattern})\b') if self.terms else None
+        self._terms_cache = {}
+        self.cache_size = int(os.getenv('RANKING_CACHE_SIZE', 50000))
+
+    def _article_terms(self, article):
+        """Keyword columns, their counts and the length in words of one article"""
+        # The title counts twice: it says what the story is about
+        title = (article.title or '').lower()
+        text = f"{title} {title} {(article.description or '').lower()}"
+        found = {}
+        if self._pattern is not None:
+            for term in self._pattern.findall(text):
+                column = self._index[term]
+                found[column] = found.get(column, 0) + 1
+        return tuple(found), tuple(found.values()), text.count(' ') + 1
+
+    def _term_counts(self, articles):
+        """Keyword occurrence matrix (articles x terms) and document lengths in words"""
+        counts = np.zeros((len(articles), len(self.terms)), dtype=np.float64)
+        lengths = np.ones(len(articles), dtype=np.float64)
+        if len(self._terms_cache) > self.cache_size:
+            self._terms_cache.clear()
+
+        # Scanning the text dominates the cost, so each article is scanned once
+        # and later rankings (daemon runs, editions) only scan new candidates
+        rows, cols, values = [], [], []
+        for i, article in enumerate(articles):
+            key = (article.url, article.title)
+            terms = self._terms_cache.get(key)
+            if terms is None:
+                terms = self._terms_cache[key] = self._article_terms(article)
+            rows.extend([i] * len(terms[0]))
+            cols.extend(terms[0])
+            values.extend(terms[1])
+            lengths[i] = terms[2]
+        counts[rows, cols] = values
+        return counts, lengths
+
+    def _relevance(self, articles):
+        """TF-IDF score of the keywords in each article, scaled to 0..1"""
+        counts, lengths = self._term_counts(articles)
+        tf = np.log1p(counts) / np.sqrt(lengths)[:, None]
+        df = np.count_nonzero(counts, axis=0)
+        idf = np.log((1 + len(articles)) / (1 + df)) + 1
+        scores = tf @ (idf * self.weights)
+        top = scores.max(initial=0)
+        return scores / top if top > 0 else scores
+
+    def _recency(self, articles, now=None):
+        """Exponential decay by age, 1 for an article published now"""
+        now = now.timestamp() if now else time.time()
+        published = np.fromiter((article.published for article in articles),
+                                dtype=np.float64, count=len(articles))
+        age_hours = np.maximum(now - published, 0) / 3600
+        return np.exp2(-age_hours / self.half_life_hours)
+
+    def scores(self, articles, now=None):
+        """Combined relevance and recency score of every article"""
+        if not articles:
+            return np.zeros(0)
+        return (self.relevance_weight * self._relevance(articles)
+                + (1 - self.relevance_weight) * self._recency(articles, now))
+
+    def select(self, articles, k, now=None):
+        """The k best articles, best first, preferring at most max_per_source from any one source"""
+        if k <= 0 or not articles:
+            return []
+        scores = self.scores(articles, now)
+
+        # Only the best few candidates are ever sorted; widen the pool if the
+        # per-source limit rejects too many of them
+        pool_size = min(len(articles), k * 4)
+        while True:
+            if pool_size < len(articles):
+                pool = np.argpartition(-scores, pool_size - 1)[:pool_size]
+            else:
+                pool = np.arange(len(articles))
+            pool = pool[np.argsort(-scores[pool], kind='stable')]
+
+            selected, skipped, per_source = [], [], {}
+            for i in pool:
+                source = articles[i].source
+                if per_source.get(source, 0) >= self.max_per_source:
+                    skipped.append(i)
+                    continue
+                per_source[source] = per_source.get(source, 0) + 1
+                selected.append(i)
+                if len(selected) == k:
+                    break
+            if len(selected) == k or pool_size >= len(articles):
+                break
+            pool_size = min(len(articles), pool_size * 4)
+
+        # With too few sources to fill k, the limit gives way to the best of the rest
+        selected.extend(skipped[:k - len(selected)])
+        selected.sort(key=lambda i: -scores[i])
+        return [articles[i] for i in selected]
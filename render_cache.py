@@ -0,0 +1,63 @@
+import hashlib
+import json
+import os
+import threading
+from cache_paths import newsletter_cache_dir
+
+class RenderCache:
+    def __init__(self, cache_dir=None, max_entries=None):
+        """Rendered decks on disk, keyed by a fingerprint of everything they were rendered from"""
+        self.cache_dir = os.path.join(cache_dir or newsletter_cache_dir(), 'decks')
+        # Decks kept before the least recently used are removed; 0 disables the cache
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv('RENDER_CACHE_MAX_ENTRIES', 20))
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def fingerprint(inputs):
+        """Stable hash of JSON-serializable render inputs"""
+        encoded = json.dumps(inputs, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+    def _path(self, fingerprint):
+        return os.path.join(self.cache_dir, f"{fingerprint}.pptx")
+
+    def get(self, fingerprint):
+        """Bytes of the deck rendered for a fingerprint, or None"""
+        if not self.max_entries:
+            return None
+        path = self._path(fingerprint)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        # Mark as recently used
+        os.utime(path)
+        return data
+
+    def put(self, fingerprint, deck):
+        """Store a rendered deck (anything with a save(path) method, such as a DeckBuffer)"""
+        if not self.max_entries:
+            return
+        path = self._path(fingerprint)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        deck.save(tmp_path)
+        os.replace(tmp_path, path)
+        self._evict()
+
+    def _evict(self):
+        """Remove the least recently used decks beyond max_entries"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.pptx'):
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    entries.append((os.path.getmtime(path), path))
+                except OSError:
+                    continue
+        entries.sort(reverse=True)
+        for _, path in entries[self.max_entries:]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
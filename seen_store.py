@@ -0,0 +1,118 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from article import Article
+from deduplicator import canonicalize_url
+from cache_paths import newsletter_cache_dir
+
+class SeenStore:
+    # Article types whose URL never changes, so their text is part of the fingerprint
+    EVERGREEN_TYPES = {'wikipedia'}
+
+    def __init__(self, db_path=None, retention_days=None):
+        """SQLite record of articles already sent and of feed validators"""
+        # Sent articles older than this are forgotten to keep the store small
+        self.retention_days = retention_days or int(os.getenv('SEEN_RETENTION_DAYS', 30))
+        if db_path is None:
+            cache_dir = newsletter_cache_dir()
+            os.makedirs(cache_dir, exist_ok=True)
+            db_path = os.path.join(cache_dir, 'newsletter.sqlite3')
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        with self._db:
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS sent_articles (
+                    fingerprint TEXT PRIMARY KEY,
+                    url TEXT,
+                    title TEXT,
+                    sent_at REAL NOT NULL
+                )""")
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS feeds (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    articles TEXT,
+                    checked_at REAL NOT NULL
+                )""")
+
+    def fingerprint(self, article, scope=''):
+        """Stable identity of an article across runs, per delivery scope such as an edition"""
+        key = canonicalize_url(article.url) or (article.title or '')
+        if article.type in self.EVERGREEN_TYPES:
+            key += '\n' + (article.description or '')
+        if scope:
+            key = f"{scope}\n{key}"
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def filter_unsent(self, articles, scope=''):
+        """Return only the articles that have not been sent before"""
+        fingerprints = [self.fingerprint(article, scope) for article in articles]
+        with self._lock:
+            sent = set()
+            # Stay well below SQLite's bound parameter limit
+            for start in range(0, len(fingerprints), 500):
+                batch = fingerprints[start:start + 500]
+                placeholders = ','.join('?' * len(batch))
+                sent.update(row[0] for row in self._db.execute(
+                    f"SELECT fingerprint FROM sent_articles WHERE fingerprint IN ({placeholders})",
+                    batch
+                ))
+        return [article for article, fingerprint in zip(articles, fingerprints)
+                if fingerprint not in sent]
+
+    def mark_sent(self, articles, scope=''):
+        """Record articles as delivered so later runs skip them"""
+        now = time.time()
+        rows = [(self.fingerprint(article, scope), article.url, article.title, now)
+                for article in articles]
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO sent_articles (fingerprint, url, title, sent_at) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self._db.execute("DELETE FROM sent_articles WHERE sent_at < ?",
+                             (now - self.retention_days * 86400,))
+
+    def get_feed(self, url):
+        """Return the stored validators and articles of a feed, or None"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT etag, last_modified, articles FROM feeds WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, articles = row
+        return {
+            'etag': etag,
+            'last_modified': last_modified,
+            'articles': [Article.from_dict(article) for article in json.loads(articles)] if articles else []
+        }
+
+    def save_feed(self, url, etag, last_modified, articles):
+        """Remember a feed's validators together with the articles parsed from it"""
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO feeds (url, etag, last_modified, articles, checked_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (url, etag, last_modified, json.dumps([article.to_dict() for article in articles]), time.time())
+            )
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def conditional_headers(self, url):
+        """Request headers that let the server answer 304 for an unchanged feed"""
+        feed = self.get_feed(url)
+        headers = {}
+        if feed:
+            if feed['etag']:
+                headers['If-None-Match'] = feed['etag']
+            if feed['last_modified']:
+                headers['If-Modified-Since'] = feed['last_modified']
+        return headers
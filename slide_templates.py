@@ -0,0 +1,276 @@
+from pptx import Presentation
+from pptx.enum.shapes import PP_PLACEHOLDER
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.packuri import PackURI
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import nsdecls, qn
+from pptx.oxml.shapes.autoshape import CT_Shape
+from pptx.oxml.simpletypes import ST_Direction, ST_PlaceholderSize
+from pptx.parts.image import ImagePart
+from pptx.shapes.shapetree import SlideShapes
+from lxml import etree
+import copy
+import os
+import re
+import tempfile
+
+# Characters XML cannot hold, which occasionally appear in feed text
+_CONTROL_CHARS = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+# Attributes through which slide XML refers to its relationships
+_REL_ATTRIBUTES = (qn('r:embed'), qn('r:link'), qn('r:id'))
+
+class MediaSpool:
+    def __init__(self):
+        """Image bytes parked in an anonymous temp file while a large deck is assembled"""
+        self.file = tempfile.TemporaryFile(prefix='tech_news_media_')
+        self._end = 0
+
+    def write(self, blob):
+        """Append blob, returning the (offset, length) to read it back with"""
+        offset = self._end
+        self.file.seek(offset)
+        self.file.write(blob)
+        self._end += len(blob)
+        return offset, len(blob)
+
+    def read(self, offset, length):
+        self.file.seek(offset)
+        return self.file.read(length)
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class SpooledImagePart(ImagePart):
+    def __init__(self, partname, content_type, package, blob, sha1, spool):
+        """Image part whose bytes stay in a MediaSpool and are only read back when the deck is saved"""
+        super().__init__(partname, content_type, package, None)
+        self._sha1 = sha1
+        self._spool = spool
+        self._extent = spool.write(blob)
+
+    @property
+    def blob(self):
+        return self._spool.read(*self._extent)
+
+    @property
+    def sha1(self):
+        return self._sha1
+
+class TemplateBuilder:
+    # Placeholder idx values below this are reserved for title/body placeholders
+    FIRST_PLACEHOLDER_IDX = 10
+
+    def __init__(self, width, height, background=None):
+        """Build a master .pptx whose layouts carry all static slide design"""
+        self.prs = Presentation()
+        self.prs.slide_width, self.prs.slide_height = width, height
+        self._unused_layouts = iter(self.prs.slide_layouts)
+        if background is not None:
+            self._set_background(background)
+
+    def _set_background(self, rgb):
+        """Give every slide a solid background through the slide master"""
+        cSld = self.prs.slide_master._element.cSld
+        bg = cSld.find(qn('p:bg'))
+        if bg is not None:
+            cSld.remove(bg)
+        cSld.insert(0, parse_xml(
+            f'<p:bg {nsdecls("p", "a")}><p:bgPr>'
+            f'<a:solidFill><a:srgbClr val="{rgb}"/></a:solidFill><a:effectLst/>'
+            f'</p:bgPr></p:bg>'
+        ))
+
+    def layout(self, name):
+        """Claim an empty layout called name and return its shape collection to draw on"""
+        try:
+            layout = next(self._unused_layouts)
+        except StopIteration:
+            raise ValueError(f"No layout left in the base template for '{name}'")
+
+        layout.name = name
+        spTree = layout.shapes._spTree
+        for shape_elm in list(spTree.iter_shape_elms()):
+            spTree.remove(shape_elm)
+        return SlideShapes(spTree, layout)
+
+    def placeholder(self, shape, name, picture=False):
+        """Turn a textbox drawn on a layout into a named text or picture placeholder"""
+        sp = shape._element
+        spTree = sp.getparent()
+        used = [ph_sp.ph_idx for ph_sp in spTree.iter_ph_elms()]
+        ph = sp.nvSpPr.nvPr.get_or_add_ph()
+        ph.type = PP_PLACEHOLDER.PICTURE if picture else PP_PLACEHOLDER.BODY
+        ph.idx = max(used + [self.FIRST_PLACEHOLDER_IDX - 1]) + 1
+        shape.name = name
+
+        # Placeholders are locked into their layout rather than marked as textboxes
+        cNvSpPr = sp.nvSpPr.cNvSpPr
+        cNvSpPr.attrib.pop('txBox', None)
+        cNvSpPr.append(parse_xml(f'<a:spLocks {nsdecls("a")} noGrp="1"/>'))
+
+        # Paragraph formatting of the first paragraph becomes the inherited
+        # level-1 style, so text filled in later picks it up automatically
+        txBody = sp.txBody
+        pPr = txBody.find(qn('a:p') + '/' + qn('a:pPr'))
+        lstStyle = txBody.find(qn('a:lstStyle'))
+        lvl1pPr = parse_xml(
+            f'<a:lvl1pPr {nsdecls("a")} marL="0" indent="0">'
+            f'<a:spcBef><a:spcPts val="0"/></a:spcBef><a:buNone/></a:lvl1pPr>'
+        )
+        if pPr is not None:
+            for attr, value in pPr.attrib.items():
+                lvl1pPr.set(attr, value)
+            defRPr = pPr.find(qn('a:defRPr'))
+            if defRPr is not None:
+                lvl1pPr.append(copy.deepcopy(defRPr))
+        for child in list(lstStyle):
+            lstStyle.remove(child)
+        lstStyle.append(lvl1pPr)
+        return shape
+
+    def save(self, path):
+        """Write the template, replacing any previous version atomically"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        self.prs.save(tmp_path)
+        os.replace(tmp_path, path)
+
+class SlideTemplate:
+    def __init__(self, path):
+        """Presentation built from a master template, filled one slide at a time"""
+        self.prs = Presentation(path)
+        self.layouts = {layout.name: layout for layout in self.prs.slide_layouts}
+        # Placeholder idx of every named field, per layout
+        self.fields = {}
+        # Ready-made placeholder shapes for text fields, copied onto each slide
+        self._text_fields = {}
+        # Position and size of picture fields, in EMU
+        self._picture_boxes = {}
+
+        for name, layout in self.layouts.items():
+            self.fields[name] = {}
+            self._text_fields[name] = {}
+            self._picture_boxes[name] = {}
+            for ph in layout.placeholders:
+                idx = ph.placeholder_format.idx
+                self.fields[name][ph.name] = idx
+                if ph.placeholder_format.type == PP_PLACEHOLDER.PICTURE:
+                    self._picture_boxes[name][ph.name] = (ph.left, ph.top, ph.width, ph.height)
+                else:
+                    self._text_fields[name][ph.name] = CT_Shape.new_placeholder_sp(
+                        0, ph.name, PP_PLACEHOLDER.BODY, ST_Direction.HORZ, ST_PlaceholderSize.FULL, idx
+                    )
+
+    def _set_text(self, sp, value):
+        """Replace a shape's paragraphs with one paragraph per line of value"""
+        txBody = sp.txBody
+        for p in txBody.findall(qn('a:p')):
+            txBody.remove(p)
+        for line in value.split('\n'):
+            r = etree.SubElement(etree.SubElement(txBody, qn('a:p')), qn('a:r'))
+            etree.SubElement(r, qn('a:t')).text = _CONTROL_CHARS.sub('', line)
+
+    def _add_picture(self, slide, image_file, box):
+        """Add a picture cropped to fill its box without distorting it"""
+        left, top, width, height = box
+        picture = slide.shapes.add_picture(image_file, left, top, width, height)
+        image_width, image_height = picture.image.size
+        box_ratio, image_ratio = width / height, image_width / image_height
+        if image_ratio > box_ratio:
+            picture.crop_left = picture.crop_right = (1 - box_ratio / image_ratio) / 2
+        elif image_ratio < box_ratio:
+            picture.crop_top = picture.crop_bottom = (1 - image_ratio / box_ratio) / 2
+        return picture
+
+    def add_slide(self, layout_name, text=None, pictures=None):
+        """Add a slide from a layout with only the fields that are filled in"""
+        layout = self.layouts[layout_name]
+        rId, slide = self.prs.part.add_slide(layout)
+        # Same as Slides.add_slide, minus cloning every layout placeholder
+        self.prs.slides._sldIdLst.add_sldId(rId)
+
+        spTree = slide.shapes._spTree
+        for shape_id, (name, value) in enumerate((text or {}).items(), start=2):
+            sp = copy.deepcopy(self._text_fields[layout_name][name])
+            sp.nvSpPr.cNvPr.id = shape_id
+            self._set_text(sp, value)
+            spTree.append(sp)
+        for name, image_file in (pictures or {}).items():
+            self._add_picture(slide, image_file, self._picture_boxes[layout_name][name])
+        return slide
+
+    def field(self, slide, layout_name, name):
+        """Return the filled placeholder for a named field of a slide"""
+        idx = self.fields[layout_name][name]
+        return next(shape for shape in slide.shapes
+                    if shape.is_placeholder and shape.placeholder_format.idx == idx)
+
+    def clear(self):
+        """Remove every slide so the already parsed template can be filled again"""
+        sldIdLst = self.prs.slides._sldIdLst
+        for sldId in list(sldIdLst):
+            sldIdLst.remove(sldId)
+            # Slide parts no longer reachable from the presentation are left out of the next save
+            self.prs.part.drop_rel(sldId.rId)
+
+    def export_slides(self):
+        """Every slide as (layout name, XML, {rId: image sha1}) plus the images by sha1,
+        so the slides can be rebuilt in another process's presentation"""
+        fragments, media = [], {}
+        for slide in self.prs.slides:
+            images = {}
+            for rel in slide.part.rels:
+                if rel.reltype == RT.IMAGE:
+                    part = rel.target_part
+                    media.setdefault(part.sha1, (part.content_type, part.ext, part.blob))
+                    images[rel.rId] = part.sha1
+            fragments.append((slide.slide_layout.name, etree.tostring(slide._element), images))
+        return fragments, media
+
+    def import_slides(self, fragments, media, spool=None):
+        """Append slides exported by export_slides, storing each distinct image once,
+        in spool rather than in memory when one is given"""
+        # One walk over the package instead of one per picture, as add_picture does
+        image_parts, next_idx = {}, 1
+        for part in self.prs.part.package.iter_parts():
+            if isinstance(part, ImagePart):
+                image_parts.setdefault(part.sha1, part)
+                next_idx = max(next_idx, (part.partname.idx or 0) + 1)
+
+        for layout_name, xml, images in fragments:
+            rId, slide = self.prs.part.add_slide(self.layouts[layout_name])
+            self.prs.slides._sldIdLst.add_sldId(rId)
+
+            rIds = {}
+            for old_rId, sha1 in images.items():
+                if sha1 not in image_parts:
+                    content_type, ext, blob = media[sha1]
+                    partname = PackURI(f"/ppt/media/image{next_idx}.{ext}")
+                    if spool is None:
+                        image_parts[sha1] = ImagePart(partname, content_type, self.prs.part.package, blob)
+                    else:
+                        image_parts[sha1] = SpooledImagePart(partname, content_type, self.prs.part.package,
+                                                             blob, sha1, spool)
+                    next_idx += 1
+                rIds[old_rId] = slide.part.relate_to(image_parts[sha1], RT.IMAGE)
+
+            # Move the fragment's content into the new slide, pointing at the new relationships
+            sld, fragment = slide._element, parse_xml(xml)
+            for element in fragment.iter():
+                for attribute in _REL_ATTRIBUTES:
+                    if element.get(attribute) in rIds:
+                        element.set(attribute, rIds[element.get(attribute)])
+            for child in list(sld):
+                sld.remove(child)
+            for child in list(fragment):
+                sld.append(child)
+
+    def save(self, file):
+        """Save the filled presentation to a path or file-like object"""
+        self.prs.save(file)
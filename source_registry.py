@@ -0,0 +1,51 @@
+from instrumentation import metrics
+import importlib
+import os
+import sys
+import time
+
+# Backends by name as "module:Class"; a module is imported only when its backend is used
+SOURCES = {
+    'newsapi': 'newsapi_source:NewsAPISource',
+    'wikipedia': 'wikipedia_source:WikipediaSource',
+    'rss': 'rss_source:RSSSource'
+}
+CONTENT_PROVIDERS = {
+    'openai': 'openai:OpenAI'
+}
+
+# Seconds spent importing each lazily loaded module, in load order
+import_times = {}
+
+def enabled_sources():
+    """Source names listed in NEWS_SOURCES (comma-separated), or every registered source"""
+    configured = [name.strip() for name in os.getenv('NEWS_SOURCES', '').split(',') if name.strip()]
+    unknown = set(configured) - set(SOURCES)
+    if unknown:
+        raise ValueError(f"Unknown news sources in NEWS_SOURCES: {', '.join(sorted(unknown))}")
+    return configured or list(SOURCES)
+
+def load(spec):
+    """Import the module of a "module:attribute" spec on first use and return the attribute"""
+    module_name, attribute = spec.split(':')
+    if module_name not in sys.modules:
+        start = time.perf_counter()
+        with metrics.stage('import', module=module_name):
+            importlib.import_module(module_name)
+        import_times[module_name] = time.perf_counter() - start
+    return getattr(sys.modules[module_name], attribute)
+
+def load_source(name):
+    """Class implementing a registered news source"""
+    return load(SOURCES[name])
+
+def load_provider(name):
+    """Client class of a registered content provider"""
+    return load(CONTENT_PROVIDERS[name])
+
+def import_report():
+    """Lines describing what the lazily loaded backends cost to import, slowest first"""
+    lines = [f"{module:<20} {seconds * 1000:8.1f} ms"
+             for module, seconds in sorted(import_times.items(), key=lambda item: -item[1])]
+    lines.append(f"{'total':<20} {sum(import_times.values()) * 1000:8.1f} ms")
+    return '\n'.join(lines)
@@ -0,0 +1,169 @@
+from concurrent.futures import ThreadPoolExecutor
+from article import Article, parse_timestamp
+import json
+import os
+import time
+from instrumentation import metrics
+import http_client
+from cache_paths import newsletter_cache_dir
+
+class WikipediaSource:
+    DEFAULT_TOPICS = ["Artificial intelligence", "Machine learning",
+                      "Cloud computing", "Blockchain"]
+    # MediaWiki limits: titles per query, and intro extracts per query
+    INFO_BATCH_SIZE = 50
+    EXTRACT_BATCH_SIZE = 20
+
+    def __init__(self, topics=None, cache_dir=None, ttl=None, timeout=(5, 10), session=None):
+        """Wikipedia backend resolving all topics in batched MediaWiki API queries"""
+        self.api_url = os.getenv('WIKIPEDIA_API_URL', 'https://en.wikipedia.org/w/api.php')
+        if topics is None:
+            configured = os.getenv('WIKIPEDIA_TOPICS', '')
+            topics = [topic.strip() for topic in configured.split(',') if topic.strip()]
+        self.topics = topics or list(self.DEFAULT_TOPICS)
+        # Seconds a cached topic is used without asking Wikipedia whether it changed
+        self.ttl = ttl if ttl is not None else int(os.getenv('WIKIPEDIA_CACHE_TTL', 6 * 3600))
+        self.timeout = timeout
+        self.session = session or http_client.get_session()
+
+        cache_dir = cache_dir or newsletter_cache_dir()
+        os.makedirs(cache_dir, exist_ok=True)
+        self.cache_file = os.path.join(cache_dir, 'wikipedia.json')
+
+    def _load_cache(self):
+        """Read cached pages keyed by topic"""
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_cache(self, cache):
+        """Write cached pages atomically"""
+        tmp_file = f"{self.cache_file}.{os.getpid()}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(cache, f)
+        os.replace(tmp_file, self.cache_file)
+
+    def _query(self, **params):
+        """Run a MediaWiki query and return its JSON body"""
+        params.update(action='query', format='json', formatversion=2)
+        response = self.session.get(self.api_url, params=params, timeout=self.timeout,
+                                    headers={'User-Agent': 'AI-Tech-Newsletter/1.0'})
+        response.raise_for_status()
+        metrics.add_bytes('source', len(response.content), source='wikipedia')
+        return response.json()
+
+    def _resolve(self, topics):
+        """Look up the current revision of each topic's page, following redirects"""
+        resolved = {}
+        for start in range(0, len(topics), self.INFO_BATCH_SIZE):
+            batch = topics[start:start + self.INFO_BATCH_SIZE]
+            data = self._query(titles='|'.join(batch), prop='info|pageprops|revisions',
+                               inprop='url', ppprop='disambiguation', rvprop='timestamp',
+                               redirects=1)
+            query = data.get('query', {})
+
+            # Map each requested title to the page title it ends up at
+            aliases = {}
+            for step in query.get('normalized', []) + query.get('redirects', []):
+                aliases[step['from']] = step['to']
+            pages = {page['title']: page for page in query.get('pages', [])}
+
+            for topic in batch:
+                title = topic
+                for _ in range(len(aliases)):
+                    if title in pages or title not in aliases:
+                        break
+                    title = aliases[title]
+                page = pages.get(title)
+                if not page or page.get('missing') or page.get('invalid'):
+                    continue
+                if 'disambiguation' in page.get('pageprops', {}):
+                    continue
+                resolved[topic] = page
+        return resolved
+
+    def _fetch_extracts(self, pageids):
+        """Fetch two-sentence plain text intros for pages, keyed by page id"""
+        batches = [pageids[start:start + self.EXTRACT_BATCH_SIZE]
+                   for start in range(0, len(pageids), self.EXTRACT_BATCH_SIZE)]
+
+        def fetch_batch(batch):
+            data = self._query(pageids='|'.join(str(pageid) for pageid in batch),
+                               prop='extracts', exintro=1, explaintext=1,
+                               exsentences=2, exlimit=len(batch))
+            return {page['pageid']: page.get('extract', '')
+                    for page in data.get('query', {}).get('pages', [])}
+
+        extracts = {}
+        if not batches:
+            return extracts
+        with ThreadPoolExecutor(max_workers=len(batches), thread_name_prefix='wikipedia') as executor:
+            for result in executor.map(fetch_batch, batches):
+                extracts.update(result)
+        return extracts
+
+    def _refresh(self, cache, topics):
+        """Update cache entries for topics, fetching text only for changed pages"""
+        now = time.time()
+        pages = self._resolve(topics)
+
+        changed = {page['pageid'] for topic, page in pages.items()
+                   if cache.get(topic, {}).get('revid') != page.get('lastrevid')}
+        extracts = self._fetch_extracts(sorted(changed))
+
+        # Remember topics without a usable page so they are not looked up every run
+        for topic in topics:
+            if topic not in pages:
+                cache[topic] = {'checked_at': now}
+
+        for topic, page in pages.items():
+            entry = cache.get(topic)
+            if entry and entry.get('revid') == page.get('lastrevid'):
+                entry['checked_at'] = now
+                continue
+            if not extracts.get(page['pageid']):
+                continue
+            cache[topic] = {
+                'title': page['title'],
+                'url': page.get('fullurl'),
+                'revid': page.get('lastrevid'),
+                # When the page last changed, the closest thing it has to a publication date
+                'revised_at': (page.get('revisions') or [{}])[0].get('timestamp'),
+                'summary': extracts[page['pageid']],
+                'checked_at': now
+            }
+
+    def fetch(self):
+        """Return one Article per configured topic"""
+        cache = self._load_cache()
+        now = time.time()
+        stale = [topic for topic in self.topics
+                 if now - cache.get(topic, {}).get('checked_at', 0) >= self.ttl]
+
+        if stale:
+            try:
+                self._refresh(cache, stale)
+                self._save_cache(cache)
+            except Exception as e:
+                # Fall back to whatever is cached, however old
+                print(f"Error refreshing Wikipedia topics: {str(e)}")
+
+        articles = []
+        seen_urls = set()
+        for topic in self.topics:
+            entry = cache.get(topic)
+            # Several topics can redirect to the same page
+            if not entry or 'summary' not in entry or entry['url'] in seen_urls:
+                continue
+            seen_urls.add(entry['url'])
+            articles.append(Article(
+                title=f"Wikipedia: {entry['title']}",
+                description=entry['summary'],
+                url=entry['url'],
+                source='Wikipedia',
+                published=parse_timestamp(entry.get('revised_at')),
+                type='wikipedia'
+            ))
+        return articles